@@ -1,18 +1,34 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env before anything else
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, g, Response
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
+try:
+    import redis  # Optional: only needed for the Redis-backed shared stores
+except ImportError:
+    redis = None
+try:
+    import numpy as np  # Optional: vectorized feature statistics
+except ImportError:
+    np = None
 from datetime import datetime, timedelta
+import base64
+import bisect
+import gc
 import hashlib
 import json
 import time
 import random
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict
 import re
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import logging
+import math
+import sqlite3
+import threading
+import unicodedata
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +45,62 @@ class Config:
     SPOTIPY_CLIENT_SECRET = os.environ.get("SPOTIPY_CLIENT_SECRET")
     RATE_LIMIT_REQUESTS = 50
     RATE_LIMIT_WINDOW = 3600  # 1 hour
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory | sqlite | redis
+    RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH', '/tmp/ai-album-finder-ratelimit.db')
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # memory | sqlite | redis
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', '/tmp/ai-album-finder-cache.db')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/1')
+    # Two-tier mode: a small per-worker LRU in front of the shared sqlite/redis store
+    CACHE_LOCAL_TIER = os.environ.get('CACHE_LOCAL_TIER', '').lower() in ('1', 'true', 'yes')
+    CACHE_LOCAL_TTL = int(os.environ.get('CACHE_LOCAL_TTL', 60))  # seconds; bounds cross-worker staleness
+    CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', 500))
+    SPOTIFY_CACHE_ENABLED = os.environ.get('SPOTIFY_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    SPOTIFY_CACHE_MAX_ENTRIES = int(os.environ.get('SPOTIFY_CACHE_MAX_ENTRIES', 2000))  # per method
+    SPOTIFY_CACHE_MAX_BYTES = int(os.environ.get('SPOTIFY_CACHE_MAX_BYTES', 8 * 1024 * 1024))  # per method
+    SPOTIFY_CACHE_TTLS = {  # seconds; methods not listed here are not cached
+        'search': 3600,
+        'artist': 6 * 3600,
+        'artists': 6 * 3600,
+        'artist_top_tracks': 3600,
+        'audio_features': 7 * 24 * 3600  # audio analysis of a track never changes
+    }
+    AUDIO_FEATURES_BATCH_SIZE = 100  # Spotify accepts up to 100 IDs per request
+    SPOTIFY_MAX_WORKERS = int(os.environ.get('SPOTIFY_MAX_WORKERS', 8))
+    SEARCH_DEADLINE = float(os.environ.get('SEARCH_DEADLINE', 15))  # seconds per search
+    AUDIO_FEATURES_BREAKER_THRESHOLD = 3  # consecutive failures before the stage is skipped
+    AUDIO_FEATURES_BREAKER_RESET = 300  # seconds before a half-open trial request
+    MUSIC_CONTENT_PATH = os.environ.get(
+        'MUSIC_CONTENT_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'music_content.json')
+    )
+    PRELOAD_CONTENT = os.environ.get('PRELOAD_CONTENT', '').lower() in ('1', 'true', 'yes')
+    VECTORIZE_MIN_ROWS = 256  # below this, pure Python statistics are faster than NumPy
+    ANALYZE_BATCH_MAX_ARTISTS = 50
+    ANALYZE_BATCH_MAX_TRACKS = 500  # per artist
+    INSIGHTS_CACHE_TTL = int(os.environ.get('INSIGHTS_CACHE_TTL', 6 * 3600))  # seconds
+    INSIGHTS_CACHE_MAX_ENTRIES = int(os.environ.get('INSIGHTS_CACHE_MAX_ENTRIES', 1000))
+    INSIGHTS_CACHE_MAX_BYTES = int(os.environ.get('INSIGHTS_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    # After INSIGHTS_CACHE_TTL an artist payload is stale: it is still served
+    # (while a background refresh runs) for up to this many more seconds
+    ARTIST_MAX_STALENESS = int(os.environ.get('ARTIST_MAX_STALENESS', 24 * 3600))
+    QUERY_ALIAS_TTL = 30 * 24 * 3600  # normalized query -> artist ID; artist IDs never change
+    QUERY_ALIAS_MAX_ENTRIES = int(os.environ.get('QUERY_ALIAS_MAX_ENTRIES', 100000))
+    NEGATIVE_CACHE_TTL = int(os.environ.get('NEGATIVE_CACHE_TTL', 3600))  # seconds to remember "no artists found"
+    NEGATIVE_CACHE_MAX_ENTRIES = int(os.environ.get('NEGATIVE_CACHE_MAX_ENTRIES', 100000))
+    # Only used with CACHE_BACKEND=memory; defaults to the cache size (~120 KB at 1% error)
+    NEGATIVE_BLOOM_CAPACITY = int(os.environ.get('NEGATIVE_BLOOM_CAPACITY', NEGATIVE_CACHE_MAX_ENTRIES))
+    NEGATIVE_BLOOM_ERROR_RATE = 0.01
+    ARTIST_DETAILS_CACHE_TTL = 24 * 3600  # seconds
+    ARTIST_DETAILS_CACHE_MAX_ENTRIES = 5000
+    ARTISTS_BATCH_SIZE = 50  # Spotify accepts up to 50 IDs per /artists request
+    ARTIST_RESOURCE_MAX_AGE = int(os.environ.get('ARTIST_RESOURCE_MAX_AGE', 300))  # seconds, GET /api/artist/<id>
+    ALBUMS_PAGE_SIZE = 50  # Spotify's max limit for /artists/{id}/albums
+    ALBUMS_PREFETCH_PAGES = int(os.environ.get('ALBUMS_PREFETCH_PAGES', 2))  # pages fetched ahead of the client
+    ALBUM_PAGES_CACHE_TTL = 6 * 3600  # seconds
+    ALBUM_PAGES_CACHE_MAX_ENTRIES = 5000
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 2000))
+    ANALYSIS_CACHE_TTL = 7 * 24 * 3600  # keys already change with inputs and rules
 
 # Initialize Spotify client with error handling and clear error for missing credentials
 sp = None
@@ -46,49 +118,1331 @@ else:
         logger.error(f"Failed to initialize Spotify client: {e}")
         sp = None
 
+class LRUCache:
+    """Thread-safe in-memory LRU cache with per-entry TTL and entry/byte budgets.
+
+    Entry sizes are estimated from their JSON encoding, so values should be
+    JSON-serializable (the same data we hand to jsonify).
+    """
+    
+    def __init__(self, max_entries=1000, max_bytes=None, ttl=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, size, value = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value, ttl=None):
+        size = len(json.dumps(value, default=str))
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size} bytes exceeds cache budget")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + (ttl or self.ttl), size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+_sqlite_local = threading.local()
+
+def sqlite_connection(path):
+    """This thread's connection to the SQLite file at path.
+
+    Every SQLiteCache namespace and the SQLite rate limiter on the same file
+    share one WAL-mode connection per thread. Connections must not be shared
+    across threads or forked workers, so they are reopened after a fork.
+    """
+    pid = os.getpid()
+    if getattr(_sqlite_local, 'pid', None) != pid:
+        _sqlite_local.connections = {}
+        _sqlite_local.pid = pid
+    conn = _sqlite_local.connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        _sqlite_local.connections[path] = conn
+    return conn
+
+class SQLiteCache:
+    """TTL cache shared by every worker on one host via a SQLite file.
+
+    Values are stored as JSON under a per-cache namespace. Expired rows are
+    purged, and the namespace trimmed to ``max_entries`` (soonest-expiring
+    first), at most every ``purge_interval`` seconds. Store errors are logged
+    and treated as misses so a bad disk never fails a request.
+    """
+    
+    def __init__(self, path, namespace, max_entries=1000, ttl=3600, purge_interval=60):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        conn = sqlite_connection(self.path)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_expiry ON cache_entries (namespace, expires_at)')
+    
+    def get(self, key, default=None):
+        try:
+            row = sqlite_connection(self.path).execute(
+                'SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (self.namespace, key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Cache read failed for {self.namespace}:{key}: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        try:
+            conn = sqlite_connection(self.path)
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                (self.namespace, key, json.dumps(value, default=str), now + (ttl or self.ttl))
+            )
+            if now >= self._next_purge:
+                self._next_purge = now + self.purge_interval
+                self._purge(conn, now)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed for {self.namespace}:{key}: {e}")
+    
+    def _purge(self, conn, now):
+        conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?', (self.namespace, now))
+        conn.execute(
+            'DELETE FROM cache_entries WHERE namespace = ? AND key IN ('
+            'SELECT key FROM cache_entries WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.namespace, self.namespace, self.max_entries)
+        )
+    
+    def clear(self):
+        try:
+            sqlite_connection(self.path).execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Cache clear failed for {self.namespace}: {e}")
+    
+    def __len__(self):
+        return self._count() or 0
+    
+    def _count(self):
+        """Entries in this namespace, or None if the store is unavailable"""
+        try:
+            return sqlite_connection(self.path).execute(
+                'SELECT COUNT(*) FROM cache_entries WHERE namespace = ?', (self.namespace,)
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Cache count failed for {self.namespace}: {e}")
+            return None
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': 'sqlite',
+            'entries': self._count(),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'errors': self.errors
+        }
+
+class RedisCache:
+    """TTL cache stored in any Redis-protocol server, shared across workers and hosts.
+
+    Values are stored as JSON with a per-entry expiry; size is bounded by the
+    server's maxmemory policy (use allkeys-lru). Store errors are logged and
+    treated as misses. Counting entries needs a full SCAN, so stats() reports
+    them as unknown (None); len() still scans for explicit use.
+    """
+    
+    def __init__(self, namespace, url=None, client=None, ttl=3600):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+            client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.client = client
+        self.namespace = namespace
+        self.prefix = f"cache:{namespace}:"
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+    
+    def get(self, key, default=None):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:  # any client/connection error
+            self.errors += 1
+            logger.warning(f"Cache read failed for {self.namespace}:{key}: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+    
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(self.prefix + key, json.dumps(value, default=str), px=int((ttl or self.ttl) * 1000))
+        except Exception as e:  # any client/connection error
+            self.errors += 1
+            logger.warning(f"Cache write failed for {self.namespace}:{key}: {e}")
+    
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=self.prefix + '*'):
+                self.client.delete(key)
+        except Exception as e:  # any client/connection error
+            self.errors += 1
+            logger.warning(f"Cache clear failed for {self.namespace}: {e}")
+    
+    def __len__(self):
+        try:
+            return sum(1 for _ in self.client.scan_iter(match=self.prefix + '*'))
+        except Exception as e:  # any client/connection error
+            self.errors += 1
+            logger.warning(f"Cache count failed for {self.namespace}: {e}")
+            return 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': 'redis',
+            'entries': None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'errors': self.errors
+        }
+
+class TieredCache:
+    """A per-worker LRUCache in front of a shared cache.
+
+    Reads try the local tier first and populate it from the shared tier;
+    writes go to both. The local TTL bounds how long a worker can serve an
+    entry that another worker has since replaced.
+    """
+    
+    def __init__(self, local, shared):
+        self.local = local
+        self.shared = shared
+    
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.shared.get(key)
+        if value is None:
+            return default
+        self.local.set(key, value)
+        return value
+    
+    def set(self, key, value, ttl=None):
+        self.shared.set(key, value, ttl=ttl)
+        self.local.set(key, value, ttl=min(ttl or self.local.ttl, self.local.ttl))
+    
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+    
+    def __len__(self):
+        return len(self.shared)
+    
+    def stats(self):
+        shared = self.shared.stats()
+        return {'entries': shared['entries'], 'local': self.local.stats(), 'shared': shared}
+
+def create_cache(namespace, max_entries=1000, max_bytes=None, ttl=3600, backend=None):
+    """Build a cache on the backend selected by Config.CACHE_BACKEND.
+
+    Every backend exposes get/set/clear/len/stats like LRUCache, so callers
+    do not care where entries live.
+    """
+    backend = (backend or Config.CACHE_BACKEND).lower()
+    if backend == 'sqlite':
+        shared = SQLiteCache(Config.CACHE_SQLITE_PATH, namespace, max_entries=max_entries, ttl=ttl)
+    elif backend == 'redis':
+        shared = RedisCache(namespace, url=Config.CACHE_REDIS_URL, ttl=ttl)
+    else:
+        if backend != 'memory':
+            logger.warning(f"Unknown CACHE_BACKEND '{backend}'; using in-memory cache")
+        return LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    
+    if not Config.CACHE_LOCAL_TIER:
+        return shared
+    local = LRUCache(
+        max_entries=min(max_entries, Config.CACHE_LOCAL_MAX_ENTRIES),
+        max_bytes=max_bytes,
+        ttl=min(ttl, Config.CACHE_LOCAL_TTL)
+    )
+    return TieredCache(local, shared)
+
+class CachedSpotify:
+    """Read-through caching proxy around a spotipy client.
+
+    Methods listed in ``ttls`` are cached per method (one create_cache
+    namespace each, so they share the configured backend), keyed by a digest
+    of their arguments and bounded by entry count and, in memory, by bytes.
+    Everything else passes straight through, so call sites use it exactly
+    like spotipy.Spotify. Exceptions are never cached.
+    """
+    
+    def __init__(self, client, ttls, max_entries=2000, max_bytes=None):
+        self._client = client
+        self._ttls = dict(ttls)
+        self._caches = {
+            method: create_cache(f"spotify:{method}", max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+            for method, ttl in self._ttls.items()
+        }
+        self._counters = {method: [0, 0] for method in self._ttls}  # hits, misses
+        self._lock = threading.Lock()
+        self._methods = {}
+    
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self._caches or not callable(attr):
+            return attr
+        method = self._methods.get(name)
+        if method is None:
+            method = self._methods[name] = self._cached_method(name)
+        return method
+    
+    def _cached_method(self, name):
+        cache = self._caches[name]
+        counters = self._counters[name]
+        
+        def cached(*args, **kwargs):
+            digest = self._key(args, kwargs)
+            result = cache.get(digest)
+            with self._lock:
+                counters[0 if result is not None else 1] += 1
+            if result is None:
+                result = getattr(self._client, name)(*args, **kwargs)
+                if result is not None:
+                    cache.set(digest, result)
+            return result
+        
+        cached.__name__ = name
+        return cached
+    
+    @staticmethod
+    def _key(args, kwargs):
+        return hashlib.blake2b(
+            json.dumps([args, kwargs], sort_keys=True, default=str).encode('utf-8'), digest_size=16
+        ).hexdigest()
+    
+    def refresh(self, name, *args, **kwargs):
+        """Call the client directly and overwrite the cached result, if the method is cached"""
+        result = getattr(self._client, name)(*args, **kwargs)
+        if name in self._caches and result is not None:
+            self._caches[name].set(self._key(args, kwargs), result)
+        return result
+    
+    def cache_stats(self):
+        """Per-method hit/miss counters and cache sizes"""
+        with self._lock:
+            counters = {method: tuple(values) for method, values in self._counters.items()}
+        stats = {}
+        for method, (hits, misses) in counters.items():
+            lookups = hits + misses
+            stats[method] = {
+                'ttl': self._ttls[method],
+                'entries': self._caches[method].stats()['entries'],
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+            }
+        return stats
+    
+    def clear_cache(self):
+        for cache in self._caches.values():
+            cache.clear()
+
+if sp is not None and Config.SPOTIFY_CACHE_ENABLED:
+    sp = CachedSpotify(
+        sp, Config.SPOTIFY_CACHE_TTLS,
+        max_entries=Config.SPOTIFY_CACHE_MAX_ENTRIES,
+        max_bytes=Config.SPOTIFY_CACHE_MAX_BYTES
+    )
+
+def call_spotify(method, *args, refresh=False, **kwargs):
+    """Call an sp method; refresh=True bypasses (and overwrites) CachedSpotify's cached result"""
+    if refresh and isinstance(sp, CachedSpotify):
+        return sp.refresh(method, *args, **kwargs)
+    return getattr(sp, method)(*args, **kwargs)
+
+class IndexedCollection:
+    """Insertion-ordered collection of dicts indexed by one of their fields.
+
+    Gives O(1) membership checks, inserts and deletes while still iterating
+    (and serializing via to_list) in the order items were added.
+    """
+    
+    def __init__(self, id_field):
+        self.id_field = id_field
+        self._items = {}
+    
+    def add(self, item):
+        """Add item unless its ID is already present. Returns True if added."""
+        item_id = item[self.id_field]
+        if item_id in self._items:
+            return False
+        self._items[item_id] = item
+        return True
+    
+    def remove(self, item_id):
+        """Remove and return the item with item_id, or None if absent"""
+        return self._items.pop(item_id, None)
+    
+    def get(self, item_id, default=None):
+        return self._items.get(item_id, default)
+    
+    def clear(self):
+        self._items.clear()
+    
+    def to_list(self):
+        return list(self._items.values())
+    
+    def __contains__(self, item_id):
+        return item_id in self._items
+    
+    def __iter__(self):
+        return iter(self._items.values())
+    
+    def __len__(self):
+        return len(self._items)
+
 # In-memory storage (production would use Redis/PostgreSQL)
 user_sessions = {}
 search_analytics = defaultdict(int)
-music_insights_cache = {}
-rate_limit_tracker = defaultdict(list)
+music_insights_cache = create_cache(
+    'insights',
+    max_entries=Config.INSIGHTS_CACHE_MAX_ENTRIES,
+    max_bytes=Config.INSIGHTS_CACHE_MAX_BYTES,
+    ttl=Config.INSIGHTS_CACHE_TTL
+)
+query_alias_index = create_cache(
+    'query_aliases',
+    max_entries=Config.QUERY_ALIAS_MAX_ENTRIES,
+    ttl=Config.QUERY_ALIAS_TTL
+)
+artist_details_cache = create_cache(
+    'artist_details',
+    max_entries=Config.ARTIST_DETAILS_CACHE_MAX_ENTRIES,
+    ttl=Config.ARTIST_DETAILS_CACHE_TTL
+)
+album_pages_cache = create_cache(
+    'album_pages',
+    max_entries=Config.ALBUM_PAGES_CACHE_MAX_ENTRIES,
+    ttl=Config.ALBUM_PAGES_CACHE_TTL
+)
+analysis_cache = create_cache(
+    'analysis',
+    max_entries=Config.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl=Config.ANALYSIS_CACHE_TTL
+)
+spotify_executor = ThreadPoolExecutor(max_workers=Config.SPOTIFY_MAX_WORKERS, thread_name_prefix='spotify')
+# Separate pool: refreshes wait on spotify_executor work, so they must not occupy its threads
+refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='refresh')
+# Speculative album page prefetches get their own pool so they never queue
+# ahead of a search's deadline-bound fan-out on spotify_executor
+prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prefetch')
 user_preferences = {
     'liked_artists': set(),      # Artists the user liked (IDs only)
-    'liked_artists_data': [],    # Complete artist data with names, images, etc.
-    'saved_albums': [],          # Albums the user saved
+    'liked_artists_data': IndexedCollection('artist_id'),  # Complete artist data with names, images, etc.
+    'saved_albums': IndexedCollection('album_id'),         # Albums the user saved
     'genre_preferences': defaultdict(int),
     'listening_history': []
 }
 
+def consume_token(tokens, last_refill, now, max_requests, window):
+    """Refill a token bucket up to now and try to take one token.
+
+    Returns (allowed, retry_after_seconds, remaining_tokens).
+    """
+    refill_rate = max_requests / window
+    tokens = min(max_requests, tokens + max(now - last_refill, 0) * refill_rate)
+    if tokens < 1:
+        return False, (1 - tokens) / refill_rate, tokens
+    return True, 0.0, tokens - 1
+
+class TokenBucketLimiter:
+    """Constant-time, constant-memory per-client rate limiter (single process).
+
+    Each key gets a token bucket holding up to ``max_requests`` tokens that
+    refills continuously over ``window`` seconds. Buckets are kept in
+    least-recently-used order so idle ones (which would be full again anyway)
+    are evicted from the front as new requests arrive.
+    """
+    
+    def __init__(self):
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill, idle_expires_at]
+        self._lock = threading.Lock()
+    
+    def hit(self, key, max_requests, window, now=None):
+        """Consume one token for key. Returns (allowed, retry_after_seconds)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._evict_idle(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(max_requests), now, 0.0]
+            else:
+                self._buckets.move_to_end(key)
+            allowed, retry_after, bucket[0] = consume_token(bucket[0], bucket[1], now, max_requests, window)
+            bucket[1] = now
+            bucket[2] = now + window
+            return allowed, retry_after
+    
+    def _evict_idle(self, now):
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if oldest[2] > now:
+                break
+            self._buckets.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+    
+    def __len__(self):
+        return len(self._buckets)
+
+class SQLiteRateLimiter:
+    """Token-bucket limiter shared by every worker on one host via a SQLite file.
+
+    The database runs in WAL mode so readers never block the single writer,
+    and each hit is one short IMMEDIATE transaction. Idle buckets are purged
+    every ``purge_interval`` seconds.
+    """
+    
+    def __init__(self, path, purge_interval=60):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        conn = sqlite_connection(self.path)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+            'last_refill REAL NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS rate_limit_expiry ON rate_limit_buckets (expires_at)')
+    
+    def hit(self, key, max_requests, window, now=None):
+        """Consume one token for key. Returns (allowed, retry_after_seconds)."""
+        now = time.time() if now is None else now
+        conn = sqlite_connection(self.path)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if now >= self._next_purge:
+                conn.execute('DELETE FROM rate_limit_buckets WHERE expires_at <= ?', (now,))
+                self._next_purge = now + self.purge_interval
+            row = conn.execute(
+                'SELECT tokens, last_refill FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens, last_refill = row if row else (float(max_requests), now)
+            allowed, retry_after, tokens = consume_token(tokens, last_refill, now, max_requests, window)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, last_refill, expires_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + window)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+    
+    def clear(self):
+        sqlite_connection(self.path).execute('DELETE FROM rate_limit_buckets')
+    
+    def __len__(self):
+        return sqlite_connection(self.path).execute('SELECT COUNT(*) FROM rate_limit_buckets').fetchone()[0]
+
+class RedisRateLimiter:
+    """Token-bucket limiter stored in any Redis-protocol server.
+
+    The refill-and-take step runs as one Lua script so concurrent workers (on
+    any host) see a consistent bucket, and keys expire on their own once idle.
+    """
+    
+    TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local rate = capacity / window
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last_refill')
+local tokens = tonumber(state[1]) or capacity
+local last_refill = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - last_refill, 0) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last_refill', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+return {allowed, tostring(retry_after)}
+"""
+    
+    def __init__(self, url=None, client=None, prefix='ratelimit:'):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package (pip install redis)")
+            client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.TOKEN_BUCKET_SCRIPT)
+    
+    def hit(self, key, max_requests, window, now=None):
+        """Consume one token for key. Returns (allowed, retry_after_seconds)."""
+        now = time.time() if now is None else now
+        allowed, retry_after = self._script(keys=[self.prefix + key], args=[max_requests, window, repr(now)])
+        return bool(allowed), float(retry_after)
+    
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+    
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + '*'))
+
+def create_rate_limiter(backend=None):
+    """Build the rate limiter selected by Config.RATE_LIMIT_BACKEND"""
+    backend = (backend or Config.RATE_LIMIT_BACKEND).lower()
+    if backend == 'sqlite':
+        return SQLiteRateLimiter(Config.RATE_LIMIT_SQLITE_PATH)
+    if backend == 'redis':
+        return RedisRateLimiter(Config.RATE_LIMIT_REDIS_URL)
+    if backend != 'memory':
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}'; using in-memory limiter")
+    return TokenBucketLimiter()
+
+rate_limit_tracker = create_rate_limiter()
+
 def rate_limit(max_requests=50, window=3600):
     """Rate limiting decorator"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            client_ip = request.remote_addr
-            now = time.time()
-            
-            # Clean old requests
-            rate_limit_tracker[client_ip] = [
-                timestamp for timestamp in rate_limit_tracker[client_ip]
-                if now - timestamp < window
-            ]
+            client_key = f"{f.__name__}:{request.remote_addr}"
+            try:
+                allowed, retry_after = rate_limit_tracker.hit(client_key, max_requests, window)
+            except Exception as e:
+                # A shared limiter store being down should not take the API down with it
+                logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+                allowed, retry_after = True, 0.0
             
-            # Check rate limit
-            if len(rate_limit_tracker[client_ip]) >= max_requests:
+            if not allowed:
                 return jsonify({
                     'error': 'Rate limit exceeded. Try again later.',
-                    'retry_after': window - (now - rate_limit_tracker[client_ip][0])
+                    'retry_after': retry_after
                 }), 429
             
-            # Record this request
-            rate_limit_tracker[client_ip].append(now)
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+class CircuitBreaker:
+    """Process-wide circuit breaker for a flaky or unavailable upstream endpoint.
+
+    closed -> open after ``failure_threshold`` consecutive failures; while open
+    every call is skipped. Once ``reset_timeout`` seconds have passed a single
+    trial call is let through (half-open): success closes the circuit, failure
+    re-opens it for another timeout. A trial that never reports back within
+    ``reset_timeout`` counts as failed, so the breaker cannot stay half-open.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name, failure_threshold=3, reset_timeout=300):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial_in_flight = False
+        self._trial_started_at = None
+        self._lock = threading.Lock()
+    
+    def allow_request(self):
+        """Return True if the protected call should be attempted"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.time()
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and self._trial_in_flight and (
+                now - self._trial_started_at >= self.reset_timeout
+            ):
+                logger.warning(f"Circuit '{self.name}' trial request never completed; allowing another")
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_started_at = now
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed after successful trial request")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    logger.warning(
+                        f"Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures; "
+                        f"skipping for {self.reset_timeout}s"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.time()
+    
+    def snapshot(self):
+        """JSON-serializable view of the breaker for health reporting"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(self.reset_timeout - (time.time() - self.opened_at), 0)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'trips': self.trips,
+                'retry_in_seconds': retry_in
+            }
+
+class BloomFilter:
+    """Compact probabilistic set: no false negatives, ~``error_rate`` false positives.
+
+    Sized for ``capacity`` keys; once that many have been added the filter
+    resets itself, since it cannot forget individual keys and would
+    otherwise fill up. Uses double hashing over one blake2b digest.
+    """
+    
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.resets = 0
+    
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, key):
+        positions = self._positions(key)
+        with self._lock:
+            if self.count >= self.capacity:
+                self._bits = bytearray(len(self._bits))
+                self.count = 0
+                self.resets += 1
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+    
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+    
+    def stats(self):
+        return {
+            'count': self.count,
+            'capacity': self.capacity,
+            'bits': self.num_bits,
+            'hashes': self.num_hashes,
+            'resets': self.resets
+        }
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight computation.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is running block until it finishes and receive the same result (or
+    exception). Only in-flight work is shared - nothing is cached afterwards.
+    """
+    
+    class _Call:
+        __slots__ = ('done', 'result', 'error')
+        
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, fn, on_coalesced=None):
+        """Run fn for key, or wait for the identical call already in flight.
+
+        ``on_coalesced`` is called (before waiting) when this caller joins an
+        in-flight call instead of running fn itself; callers use it to count
+        coalesced requests.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = self._Call()
+        
+        if not is_leader:
+            if on_coalesced is not None:
+                on_coalesced()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class LatencyHistogram:
+    """Thread-safe latency histogram rendered in Prometheus text format.
+
+    Observations are bucketed per combination of label values; bucket counts
+    are made cumulative only when rendering.
+    """
+    
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds, *label_values):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+    
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+        for label_values, counts, total, count in snapshot:
+            labels = ','.join(
+                f'{name}="{self._escape(value)}"' for name, value in zip(self.label_names, label_values)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return '\n'.join(lines) + '\n'
+
+stage_latency = LatencyHistogram(
+    'album_finder_stage_duration_seconds',
+    'Duration of individual search pipeline stages',
+    ['stage']
+)
+request_latency = LatencyHistogram(
+    'album_finder_request_duration_seconds',
+    'Duration of HTTP requests by endpoint',
+    ['endpoint', 'method', 'status']
+)
+
+# Concurrent identical searches share one Spotify call chain
+search_flights = SingleFlight('search')
+album_page_flights = SingleFlight('album_pages')
+# A request can join several flights (search, then artist payload); this counts requests
+coalesced_requests = defaultdict(int)
+
+def note_coalesced():
+    """Count the current request as coalesced, at most once per request"""
+    if not g.get('coalesced'):
+        g.coalesced = True
+        coalesced_requests[request.endpoint] += 1
+
+# Queries Spotify found no artists for. With the in-memory backend a Bloom
+# filter answers "never seen" for most queries before the TTL cache is
+# consulted. The filter only knows what its own worker learned, so with a
+# shared backend it is skipped: every worker must see every negative entry.
+negative_query_cache = create_cache(
+    'negative',
+    max_entries=Config.NEGATIVE_CACHE_MAX_ENTRIES,
+    ttl=Config.NEGATIVE_CACHE_TTL
+)
+negative_query_filter = (
+    BloomFilter(Config.NEGATIVE_BLOOM_CAPACITY, Config.NEGATIVE_BLOOM_ERROR_RATE)
+    if isinstance(negative_query_cache, LRUCache) else None
+)
+
+audio_features_breaker = CircuitBreaker(
+    'audio_features',
+    failure_threshold=Config.AUDIO_FEATURES_BREAKER_THRESHOLD,
+    reset_timeout=Config.AUDIO_FEATURES_BREAKER_RESET
+)
+
+class ArtistMatcher:
+    """Match artist names against a prioritized table of name patterns.
+
+    Built once from (entry, value) pairs in priority order, where each entry
+    may have ``patterns`` (substrings of the lower-cased name), ``aliases``
+    (whole-name matches) and ``requires`` (extra substrings that must also be
+    present). Whole-name aliases and patterns are looked up in a dict first;
+    otherwise every pattern is found in one pass over the name with an
+    Aho-Corasick automaton, and the highest-priority match wins. Lookup cost
+    depends on the length of the name, not on the size of the table.
+    """
+    
+    def __init__(self, entries):
+        self._exact = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        
+        for priority, (entry, value) in enumerate(entries):
+            candidate = (priority, tuple(entry.get('requires', ())), value)
+            for name in list(entry.get('aliases', ())) + list(entry.get('patterns', ())):
+                self._exact.setdefault(name, []).append(candidate)
+            for pattern in entry.get('patterns', ()):
+                self._add_pattern(pattern, candidate)
+        self._build_failure_links()
+    
+    def _add_pattern(self, pattern, candidate):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(candidate)
+    
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # A state also reports every pattern that ends at its failure state
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                queue.append(next_state)
+        for outputs in self._outputs:
+            outputs.sort(key=lambda candidate: candidate[0])
+    
+    def match(self, text):
+        """Return the value of the highest-priority entry matching text, or None"""
+        if not text:
+            return None
+        best = self._best(self._exact.get(text, ()), text, None)
+        if best is not None:
+            return best[2]
+        
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                best = self._best(outputs[state], text, best)
+        return best[2] if best is not None else None
+    
+    @staticmethod
+    def _best(candidates, text, best):
+        for candidate in candidates:
+            if best is not None and candidate[0] >= best[0]:
+                break
+            if all(required in text for required in candidate[1]):
+                return candidate
+        return best
+
+class GenreClassifier:
+    """Classify Spotify genre lists into coarse buckets in a single pass.
+
+    Genres are split into words (hyphens count as spaces) and each word and
+    adjacent word pair is looked up in a keyword -> bucket index. Compound
+    words that start or end with a single-word keyword (synthpop, metalcore,
+    electronica) fall back to that keyword; the result for every word and
+    genre string is memoized. Bucket order in the table is the precedence
+    used by primary_bucket().
+    """
+    
+    MAX_MEMOIZED = 10000
+    
+    def __init__(self, buckets):
+        self.precedence = list(buckets)
+        self._index = {keyword: bucket for bucket, keywords in buckets.items() for keyword in keywords}
+        self._affix_keywords = sorted(
+            (keyword for keyword in self._index if ' ' not in keyword),
+            key=len, reverse=True
+        )
+        self._word_buckets = {}
+        self._genre_buckets = {}
+    
+    def _classify_word(self, word):
+        bucket = self._word_buckets.get(word)
+        if bucket is None:
+            bucket = self._index.get(word)
+            if bucket is None:
+                keyword = next((k for k in self._affix_keywords if word.startswith(k) or word.endswith(k)), None)
+                bucket = self._index[keyword] if keyword else ''
+            if len(self._word_buckets) >= self.MAX_MEMOIZED:
+                self._word_buckets.clear()
+            self._word_buckets[word] = bucket
+        return bucket
+    
+    def _classify_genre(self, genre):
+        buckets = self._genre_buckets.get(genre)
+        if buckets is None:
+            words = genre.lower().replace('-', ' ').split()
+            found = {self._classify_word(word) for word in words}
+            found.update(self._index.get(f"{a} {b}", '') for a, b in zip(words, words[1:]))
+            found.discard('')
+            buckets = frozenset(found)
+            if len(self._genre_buckets) >= self.MAX_MEMOIZED:
+                self._genre_buckets.clear()
+            self._genre_buckets[genre] = buckets
+        return buckets
+    
+    def classify(self, genres):
+        """Return the frozenset of buckets matched by any genre in genres"""
+        if not genres:
+            return frozenset()
+        return frozenset().union(*(self._classify_genre(genre) for genre in genres))
+    
+    def primary_bucket(self, buckets):
+        """Highest-precedence bucket in buckets, or None"""
+        return next((bucket for bucket in self.precedence if bucket in buckets), None)
+
+class MusicContent:
+    """Persona, title and genre copy loaded from a JSON data file.
+
+    The file is read and compiled (matchers and genre classifier) on first
+    use, then re-checked at most every ``check_interval`` seconds and
+    recompiled whenever its mtime changes, so copy edits go live without
+    restarting workers. A file that fails to load keeps the previous version.
+    """
+    
+    def __init__(self, path, check_interval=5):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+    
+    def get(self):
+        """Return the current compiled content, loading or reloading as needed"""
+        now = time.time()
+        if self._snapshot is not None and now < self._next_check:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+                self._reload_if_changed()
+        return self._snapshot
+    
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            snapshot = self._compile(data)
+            snapshot['version'] = str(mtime)  # changes whenever the copy does
+            self._snapshot = snapshot
+            if self._mtime is not None:
+                logger.info(f"Reloaded music content from {self.path}")
+            self._mtime = mtime
+        except (OSError, ValueError, KeyError) as e:
+            if self._snapshot is None:
+                raise
+            logger.error(f"Keeping previous music content; failed to reload {self.path}: {e}")
+    
+    @staticmethod
+    def _compile(data):
+        profiles = data['artist_profiles']
+        return {
+            'artist_profiles': profiles,
+            'genre_analysis': data['genre_analysis'],
+            'persona_matcher': ArtistMatcher([(entry, entry['persona']) for entry in profiles if 'persona' in entry]),
+            'title_matcher': ArtistMatcher([(entry, entry['title']) for entry in profiles if 'title' in entry]),
+            'genre_classifier': GenreClassifier(data['genre_buckets'])
+        }
+
+music_content = MusicContent(Config.MUSIC_CONTENT_PATH)
+if Config.PRELOAD_CONTENT:
+    # Load before gunicorn forks (--preload) so workers share the pages copy-on-write;
+    # freezing keeps the cyclic GC from touching (and so copying) those objects
+    music_content.get()
+    gc.freeze()
+
+AUDIO_FEATURE_KEYS = ['danceability', 'energy', 'valence', 'acousticness',
+                      'instrumentalness', 'liveness', 'speechiness', 'tempo']
+TRACK_METADATA_KEYS = ['popularity', 'duration_ms', 'explicit']
+
+def compute_feature_statistics(rows, keys):
+    """Summarize numeric fields across a list of dicts in a single pass.
+
+    Returns {key: {'mean', 'min', 'max', 'std', 'count', 'sum'}} for every key
+    with at least one non-None value (std is the population standard
+    deviation, 0 for fewer than two values). Large lists use a NumPy
+    tracks x features matrix when NumPy is installed; other iterables are
+    streamed through a FeatureAccumulator.
+    """
+    if np is not None and hasattr(rows, '__len__') and len(rows) >= Config.VECTORIZE_MIN_ROWS:
+        return _feature_statistics_numpy(rows, keys)
+    return _feature_statistics_python(rows, keys)
+
+def _feature_statistics_numpy(rows, keys):
+    # None (and missing keys) become NaN and are ignored by the nan* reductions
+    flat = [value for row in rows for value in map(row.get, keys)]
+    matrix = np.array(flat, dtype=float).reshape(len(rows), len(keys))
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=0)
+    
+    stats = {}
+    with np.errstate(all='ignore'):
+        sums = np.nansum(matrix, axis=0)
+        means = sums / counts
+        mins = np.nanmin(np.where(present, matrix, np.inf), axis=0)
+        maxs = np.nanmax(np.where(present, matrix, -np.inf), axis=0)
+        deviations = np.where(present, matrix - means, 0.0)
+        stds = np.sqrt((deviations ** 2).sum(axis=0) / counts)
+    for i, key in enumerate(keys):
+        if counts[i]:
+            stats[key] = {
+                'mean': float(means[i]),
+                'min': float(mins[i]),
+                'max': float(maxs[i]),
+                'std': float(stds[i]) if counts[i] > 1 else 0,
+                'count': int(counts[i]),
+                'sum': float(sums[i])
+            }
+    return stats
+
+def _feature_statistics_python(rows, keys):
+    return FeatureAccumulator(keys).update(rows).summary()
+
+class FeatureAccumulator:
+    """Streaming per-key count/mean/std/min/max/sum over dict rows.
+
+    Uses Welford's online variance, so rows can come from any iterator
+    (e.g. a generator over a long discography) and are consumed once without
+    building intermediate lists. The reported mean is sum / count, matching
+    the NumPy and list-based paths exactly. ``rows`` counts every row seen,
+    including rows missing some keys.
+    """
+    
+    def __init__(self, keys):
+        self.rows = 0
+        self._accumulators = {key: [0, 0.0, 0.0, None, None, 0.0] for key in keys}  # count, mean, m2, min, max, sum
+    
+    def update(self, rows):
+        """Consume rows from any iterable; returns self for chaining"""
+        accumulators = self._accumulators.items()
+        seen = 0
+        for row in rows:
+            seen += 1
+            for key, acc in accumulators:
+                value = row.get(key)
+                if value is None:
+                    continue
+                acc[0] += 1
+                delta = value - acc[1]
+                acc[1] += delta / acc[0]
+                acc[2] += delta * (value - acc[1])
+                acc[3] = value if acc[3] is None or value < acc[3] else acc[3]
+                acc[4] = value if acc[4] is None or value > acc[4] else acc[4]
+                acc[5] += value
+        self.rows += seen
+        return self
+    
+    def summary(self):
+        """Stats in the compute_feature_statistics format"""
+        stats = {}
+        for key, (count, mean, m2, minimum, maximum, total) in self._accumulators.items():
+            if count:
+                stats[key] = {
+                    'mean': total / count,
+                    'min': minimum,
+                    'max': maximum,
+                    'std': (m2 / count) ** 0.5 if count > 1 else 0,
+                    'count': count,
+                    'sum': total
+                }
+        return stats
+
+def compute_grouped_feature_statistics(groups, keys):
+    """compute_feature_statistics for many lists of rows at once.
+
+    Large batches are stacked into one NumPy matrix and reduced per group with
+    reduceat, so a batch of artists shares a single vectorized pass. Returns
+    one stats dict per group, in order.
+    """
+    total_rows = sum(len(rows) for rows in groups)
+    if np is None or total_rows < Config.VECTORIZE_MIN_ROWS:
+        return [_feature_statistics_python(rows, keys) for rows in groups]
+    
+    flat = [value for rows in groups for row in rows for value in map(row.get, keys)]
+    matrix = np.array(flat, dtype=float).reshape(total_rows, len(keys))
+    present = ~np.isnan(matrix)
+    values = np.where(present, matrix, 0.0)
+    
+    # reduceat needs non-empty segments; empty groups get {} below
+    sizes = [len(rows) for rows in groups]
+    starts = np.cumsum([0] + sizes[:-1])
+    non_empty = [i for i, size in enumerate(sizes) if size]
+    offsets = starts[non_empty]
+    
+    with np.errstate(all='ignore'):
+        counts = np.add.reduceat(present, offsets, axis=0)
+        sums = np.add.reduceat(values, offsets, axis=0)
+        means = sums / counts
+        mins = np.minimum.reduceat(np.where(present, matrix, np.inf), offsets, axis=0)
+        maxs = np.maximum.reduceat(np.where(present, matrix, -np.inf), offsets, axis=0)
+        row_means = np.repeat(means, [sizes[i] for i in non_empty], axis=0)
+        squared = np.where(present, matrix - row_means, 0.0) ** 2
+        stds = np.sqrt(np.add.reduceat(squared, offsets, axis=0) / counts)
+    
+    results = [{} for _ in groups]
+    for row, group in enumerate(non_empty):
+        stats = results[group]
+        for i, key in enumerate(keys):
+            count = int(counts[row, i])
+            if count:
+                stats[key] = {
+                    'mean': float(means[row, i]),
+                    'min': float(mins[row, i]),
+                    'max': float(maxs[row, i]),
+                    'std': float(stds[row, i]) if count > 1 else 0,
+                    'count': count,
+                    'sum': float(sums[row, i])
+                }
+    return results
+
 class MusicIntelligenceEngine:
     """Advanced music analysis and recommendation system"""
     
+    # Bump whenever analysis or insight rules change; seeds the per-artist
+    # variation so results for an artist only shift when the rules do
+    ANALYSIS_VERSION = '2'
+    
     def __init__(self):
         self.mood_profiles = {
             'energetic_happy': {'energy': (0.7, 1.0), 'valence': (0.7, 1.0)},
@@ -106,26 +1460,53 @@ class MusicIntelligenceEngine:
         }
     
     def analyze_audio_features(self, tracks, genres=None, albums=None, artist_name=None):
-        """Robust AI analysis using only top track metadata, artist genres, and album info."""
-        if not tracks:
-            return {}
+        """Robust AI analysis using only top track metadata, artist genres, and album info.
 
-        # Calculate average popularity, duration, explicit ratio
-        popularities = [t.get('popularity', 0) for t in tracks if t.get('popularity') is not None]
-        durations = [t.get('duration_ms', 0) for t in tracks if t.get('duration_ms') is not None]
-        explicit_count = sum(1 for t in tracks if t.get('explicit'))
-        total_tracks = len(tracks)
+        ``tracks`` and ``albums`` may be any iterables (including generators);
+        each is consumed in a single pass.
+        """
+        # Calculate average popularity, duration, explicit ratio in one pass
+        if hasattr(tracks, '__len__'):
+            if not tracks:
+                return {}
+            track_stats, total_tracks = compute_feature_statistics(tracks, TRACK_METADATA_KEYS), len(tracks)
+        else:
+            accumulator = FeatureAccumulator(TRACK_METADATA_KEYS).update(tracks)
+            if not accumulator.rows:
+                return {}
+            track_stats, total_tracks = accumulator.summary(), accumulator.rows
+        return self._analyze_track_statistics(track_stats, total_tracks, genres, albums, artist_name)
+    
+    def analyze_many(self, artists):
+        """Analyze a batch of (tracks, genres, albums, artist_name) tuples.
 
-        avg_popularity = sum(popularities) / len(popularities) if popularities else 0
-        avg_duration = sum(durations) / len(durations) if durations else 0
-        explicit_ratio = explicit_count / total_tracks if total_tracks else 0
+        Track statistics for the whole batch are computed in one shared pass;
+        results are returned in input order, {} for artists without tracks.
+        """
+        artists = list(artists)
+        track_lists = [tracks or [] for tracks, _, _, _ in artists]
+        batch_stats = compute_grouped_feature_statistics(track_lists, TRACK_METADATA_KEYS)
+        
+        results = []
+        for (tracks, genres, albums, artist_name), track_stats in zip(artists, batch_stats):
+            if not tracks:
+                results.append({})
+            else:
+                results.append(self._analyze_track_statistics(track_stats, len(tracks), genres, albums, artist_name))
+        return results
+    
+    def _analyze_track_statistics(self, track_stats, total_tracks, genres, albums, artist_name):
+        """Build the analysis result from precomputed track metadata statistics"""
+        avg_popularity = track_stats.get('popularity', {}).get('mean', 0)
+        avg_duration = track_stats.get('duration_ms', {}).get('mean', 0)
+        explicit_ratio = track_stats.get('explicit', {}).get('sum', 0) / total_tracks
 
         # Genre-based sophisticated analysis
         genres = genres or []
-        genre_str = ', '.join(genres).lower()
+        genre_buckets = music_content.get()['genre_classifier'].classify(genres)
         
         # Determine primary genre and characteristics
-        genre_analysis = self._analyze_genre_characteristics(genre_str, avg_popularity, explicit_ratio, durations, artist_name)
+        genre_analysis = self._analyze_genre_characteristics(genre_buckets, avg_popularity, explicit_ratio, avg_duration, artist_name)
         
         mood = genre_analysis['mood']
         complexity = genre_analysis['complexity']
@@ -135,17 +1516,17 @@ class MusicIntelligenceEngine:
         mainstream_appeal = min(int(avg_popularity * 1.2), 100)
 
         # Album trend: newer albums more popular?
-        album_years = []
-        if albums:
-            for album in albums:
-                try:
-                    year = int(str(album.get('release_date', '')).split('-')[0])
-                    album_years.append(year)
-                except Exception:
-                    continue
+        first_year = last_year = None
+        for album in albums or ():
+            try:
+                year = int(str(album.get('release_date', '')).split('-')[0])
+            except Exception:
+                continue
+            first_year = year if first_year is None or year < first_year else first_year
+            last_year = year if last_year is None or year > last_year else last_year
         trend = 'Stable'
-        if album_years:
-            if max(album_years) - min(album_years) > 5:
+        if first_year is not None:
+            if last_year - first_year > 5:
                 trend = 'Evolving'
 
         # Compose the AI analysis result
@@ -167,9 +1548,9 @@ class MusicIntelligenceEngine:
             'recommendations': recommendations
         }
     
-    def _analyze_genre_characteristics(self, genre_str, avg_popularity, explicit_ratio, durations, artist_name):
+    def _analyze_genre_characteristics(self, genre_buckets, avg_popularity, explicit_ratio, avg_duration, artist_name):
         """Generate artist-specific personalized mood profiles and recommendations"""
-        avg_duration_min = (sum(durations) / len(durations) / 60000) if durations else 3.5
+        avg_duration_min = (avg_duration / 60000) if avg_duration else 3.5
         artist_lower = artist_name.lower() if artist_name else ''
         
         # Artist-specific personalized analysis
@@ -178,558 +1559,41 @@ class MusicIntelligenceEngine:
             return personalized_analysis
         
         # Fallback to genre-based analysis if no specific persona found
-        return self._get_genre_based_analysis(genre_str, avg_popularity, explicit_ratio, artist_name)
+        return self._get_genre_based_analysis(genre_buckets, avg_popularity, explicit_ratio, artist_name)
 
     def _get_artist_persona(self, artist_lower, avg_popularity, explicit_ratio):
         """Get personalized analysis for specific artists"""
-        
-        # Pop Icons & Legends
-        if 'michael jackson' in artist_lower:
-            return {
-                'mood': 'Legendary & Timeless',
-                'complexity': 95,
-                'recommendations': [
-                    "The undisputed King of Pop who redefined music, dance, and entertainment forever",
-                    "Revolutionary artistry that transcended racial barriers and cultural boundaries worldwide",
-                    "Every beat, every move, every note is pure musical history in motion"
-                ]
-            }
-        elif 'taylor swift' in artist_lower:
-            return {
-                'mood': 'Storytelling Mastermind',
-                'complexity': 85,
-                'recommendations': [
-                    "Swift's songwriting genius transforms personal experiences into universal anthems",
-                    "From country roots to pop domination - a fearless evolution that redefined success",
-                    "Each album era represents a new chapter in the most compelling musical autobiography ever written"
-                ]
-            }
-        elif 'beyoncé' in artist_lower or 'beyonce' in artist_lower:
-            return {
-                'mood': 'Empowering Excellence',
-                'complexity': 90,
-                'recommendations': [
-                    "Queen B's vocal powerhouse delivery combined with fierce independence and artistic vision",
-                    "From Destiny's Child to solo reign - every performance is a masterclass in pure talent",
-                    "Beyoncé doesn't just make music; she creates cultural movements and empowers generations"
-                ]
-            }
-        
-        # Hip-Hop Royalty
-        elif 'drake' in artist_lower:
-            return {
-                'mood': 'Melodic Vulnerability',
-                'complexity': 70,
-                'recommendations': [
-                    "The 6 God who popularized singing-rap and emotional transparency in hip-hop",
-                    "Drake's ability to be both tough and tender revolutionized what rap could express",
-                    "From Toronto to the world - every track feels like a personal conversation with greatness"
-                ]
-            }
-        elif 'kendrick lamar' in artist_lower:
-            return {
-                'mood': 'Conscious Genius',
-                'complexity': 95,
-                'recommendations': [
-                    "Kendrick's lyrical complexity and social consciousness define modern hip-hop excellence",
-                    "Each album is a conceptual masterpiece that challenges listeners and society alike",
-                    "The poet laureate of rap who proves hip-hop can be both street-smart and intellectually profound"
-                ]
-            }
-        elif 'kanye west' in artist_lower or 'ye ' in artist_lower:
-            return {
-                'mood': 'Innovative Disruption',
-                'complexity': 88,
-                'recommendations': [
-                    "Yeezy's production genius and boundary-pushing artistry changed hip-hop forever",
-                    "Love him or hate him, Kanye's influence on music and culture is undeniable",
-                    "Every album era represents a complete reinvention of sound and artistic vision"
-                ]
-            }
-        elif 'yeat' in artist_lower:
-            return {
-                'mood': 'Hypnotic Innovation',
-                'complexity': 60,
-                'recommendations': [
-                    "Yeat's bell-laden beats and unique vocal style created a whole new wave in rap",
-                    "If you like the sound of success mixed with experimental trap, this is your artist",
-                    "The underground king who brought a fresh, addictive sound to mainstream attention"
-                ]
-            }
-        elif 'travis scott' in artist_lower:
-            return {
-                'mood': 'Psychedelic Energy',
-                'complexity': 75,
-                'recommendations': [
-                    "La Flame's atmospheric production creates immersive sonic experiences like no other",
-                    "Travis Scott concerts aren't just shows - they're transcendent musical journeys",
-                    "Auto-tuned vocals meet orchestral grandeur in the most epic way possible"
-                ]
-            }
-        
-        # Rock Legends
-        elif 'the beatles' in artist_lower:
-            return {
-                'mood': 'Revolutionary Harmony',
-                'complexity': 100,
-                'recommendations': [
-                    "The Fab Four who invented modern pop music and changed the world forever",
-                    "Every song is a piece of musical DNA that influenced every artist who came after",
-                    "From 'Love Me Do' to 'Abbey Road' - the greatest musical journey in human history"
-                ]
-            }
-        elif 'queen' in artist_lower and 'freddie' in artist_lower:
-            return {
-                'mood': 'Theatrical Majesty',
-                'complexity': 90,
-                'recommendations': [
-                    "Freddie Mercury's operatic voice and Queen's genre-defying anthems are pure rock royalty",
-                    "Every song is a stadium-filling epic designed to make you feel invincible",
-                    "We Will Rock You, We Are The Champions - these aren't just songs, they're battle cries"
-                ]
-            }
-        elif 'led zeppelin' in artist_lower:
-            return {
-                'mood': 'Mystical Power',
-                'complexity': 85,
-                'recommendations': [
-                    "Zeppelin's heavy blues and mystical lyrics created the blueprint for hard rock",
-                    "Jimmy Page's guitar wizardry meets Robert Plant's banshee wail in perfect harmony",
-                    "Stairway to Heaven isn't just a song - it's a spiritual experience through sound"
-                ]
-            }
-        
-        # R&B Royalty
-        elif 'whitney houston' in artist_lower:
-            return {
-                'mood': 'Vocal Perfection',
-                'complexity': 95,
-                'recommendations': [
-                    "Whitney's voice was a force of nature that redefined what human vocals could achieve",
-                    "The gold standard for vocal excellence - every note was delivered with divine precision",
-                    "I Will Always Love You isn't just a cover - it's the definitive version that surpassed the original"
-                ]
-            }
-        elif 'stevie wonder' in artist_lower:
-            return {
-                'mood': 'Soulful Innovation',
-                'complexity': 90,
-                'recommendations': [
-                    "Stevie's musical genius spans soul, funk, pop, and R&B with unmatched creativity",
-                    "A one-man orchestra who plays every instrument and writes timeless classics",
-                    "Superstition, Sir Duke, Isn't She Lovely - each song is a masterpiece of joy and innovation"
-                ]
-            }
-        
-        # Modern Pop Phenomena
-        elif 'billie eilish' in artist_lower:
-            return {
-                'mood': 'Dark Pop Innovation',
-                'complexity': 70,
-                'recommendations': [
-                    "Billie's whispered vocals and dark aesthetics redefined what pop music could be",
-                    "A Gen Z icon who proves you don't need to be loud to make the biggest impact",
-                    "Bad Guy changed the game - minimalist production meets maximum artistic impact"
-                ]
-            }
-        elif 'the weeknd' in artist_lower:
-            return {
-                'mood': 'Nocturnal Seduction',
-                'complexity': 80,
-                'recommendations': [
-                    "Abel's dark R&B and cinematic production create the perfect soundtrack for midnight drives",
-                    "From mysterious mixtapes to Super Bowl headliner - the ultimate artistic evolution",
-                    "Blinding Lights and Can't Feel My Face prove he's master of both darkness and light"
-                ]
-            }
-        elif 'dua lipa' in artist_lower:
-            return {
-                'mood': 'Disco Revival Queen',
-                'complexity': 65,
-                'recommendations': [
-                    "Dua Lipa brought back disco-pop with modern sophistication and irresistible grooves",
-                    "Future Nostalgia wasn't just an album - it was a time machine to the dance floor",
-                    "Levitating, Don't Start Now - pure dancefloor euphoria with impeccable production"
-                ]
-            }
-        
-        # Electronic/EDM Artists
-        elif 'daft punk' in artist_lower:
-            return {
-                'mood': 'Robotic Perfection',
-                'complexity': 85,
-                'recommendations': [
-                    "The French robots who made electronic music cool and brought house to the masses",
-                    "Get Lucky, One More Time - timeless electronic anthems that transcend genres",
-                    "Their helmets hid their faces but revealed the future of music production"
-                ]
-            }
-        elif 'skrillex' in artist_lower:
-            return {
-                'mood': 'Bass-Dropping Chaos',
-                'complexity': 70,
-                'recommendations': [
-                    "Skrillex turned dubstep from underground noise into mainstream earthquake-inducing drops",
-                    "Scary Monsters brought the bass and changed electronic music forever",
-                    "When the beat drops, your soul ascends - this is organized musical chaos at its finest"
-                ]
-            }
-        
-        # Country Legends
-        elif 'johnny cash' in artist_lower:
-            return {
-                'mood': 'Outlaw Authenticity',
-                'complexity': 75,
-                'recommendations': [
-                    "The Man in Black whose deep voice and outlaw spirit defined authentic country music",
-                    "Johnny Cash's covers of modern songs proved that great music transcends time and genre",
-                    "Ring of Fire, Hurt - whether original or cover, Cash made every song his own"
-                ]
-            }
-        
-        # Alternative/Indie Icons
-        elif 'radiohead' in artist_lower:
-            return {
-                'mood': 'Experimental Melancholy',
-                'complexity': 95,
-                'recommendations': [
-                    "Radiohead's experimental genius challenges listeners while creating beautiful sonic landscapes",
-                    "OK Computer predicted our digital dystopia with haunting accuracy and gorgeous melodies",
-                    "Thom Yorke's falsetto paired with innovative production creates art that transcends music"
-                ]
-            }
-        elif 'nirvana' in artist_lower:
-            return {
-                'mood': 'Grunge Authenticity',
-                'complexity': 70,
-                'recommendations': [
-                    "Kurt Cobain's raw emotion and Nirvana's grunge revolution spoke for a generation",
-                    "Smells Like Teen Spirit wasn't just a hit - it was a generational battle cry",
-                    "The band that proved three chords and the truth could change the world"
-                ]
-            }
-        
-        return None  # No specific persona found
+        persona = music_content.get()['persona_matcher'].match(artist_lower)
+        return dict(persona) if persona else None  # None if no specific persona found
     
-    def _get_genre_based_analysis(self, genre_str, avg_popularity, explicit_ratio, artist_name):
+    def _get_genre_based_analysis(self, genre_buckets, avg_popularity, explicit_ratio, artist_name):
         """Fallback genre-based analysis for artists without specific personas"""
+        content = music_content.get()
+        variant = content['genre_classifier'].primary_bucket(genre_buckets) or 'default'
         
-        # R&B/Soul Analysis
-        if any(g in genre_str for g in ['r&b', 'rnb', 'soul', 'neo-soul']):
-            return {
-                'mood': 'Smooth & Soulful',
-                'complexity': 70,
-                'recommendations': [
-                    f"{artist_name} crafts emotionally rich R&B with sophisticated vocal arrangements",
-                    f"Expect smooth grooves and intimate storytelling that defines modern soul music",
-                    f"Perfect for late-night listening with emphasis on vocal prowess and melodic depth"
-                ]
-            }
+        # Explicit rap and chart-topping pop get their own copy
+        if variant == 'hip_hop' and explicit_ratio > 0.7:
+            variant = 'hip_hop_explicit'
+        elif variant == 'pop' and avg_popularity > 80:
+            variant = 'pop_chart'
         
-        # Hip-Hop/Rap Analysis
-        elif any(g in genre_str for g in ['hip-hop', 'rap', 'trap', 'drill']):
-            if explicit_ratio > 0.7:
-                mood_desc = "Raw & Unfiltered"
-                recs = [
-                    f"{artist_name} delivers hard-hitting rap with uncompromising lyrical content",
-                    f"Authentic street narratives with aggressive production and powerful delivery",
-                    f"Not for the faint-hearted - expect intense themes and bold artistic expression"
-                ]
-            else:
-                mood_desc = "Lyrical & Conscious"
-                recs = [
-                    f"{artist_name} represents conscious rap with thoughtful wordplay and social commentary",
-                    f"Intelligent hip-hop that balances mainstream appeal with lyrical substance",
-                    f"Family-friendly rap that proves you can be profound without profanity"
-                ]
-            return {
-                'mood': mood_desc,
-                'complexity': 65,
-                'recommendations': recs
-            }
-        
-        # Rock Analysis
-        elif any(g in genre_str for g in ['rock', 'metal', 'punk', 'grunge']):
-            if 'metal' in genre_str or 'punk' in genre_str:
-                return {
-                    'mood': 'Intense & Aggressive',
-                    'complexity': 75,
-                    'recommendations': [
-                        f"{artist_name} unleashes raw power through crushing riffs and aggressive vocals",
-                        f"High-energy music that channels rebellion and emotional intensity",
-                        f"Not background music - demands your full attention and respect"
-                    ]
-                }
-            else:
-                return {
-                    'mood': 'Energetic & Anthemic',
-                    'complexity': 60,
-                    'recommendations': [
-                        f"{artist_name} delivers classic rock energy with memorable hooks and guitar-driven sound",
-                        f"Stadium-worthy anthems that blend technical skill with mass appeal",
-                        f"Perfect for road trips and moments when you need to feel invincible"
-                    ]
-                }
-        
-        # Pop Analysis
-        elif any(g in genre_str for g in ['pop', 'dance-pop', 'electropop']):
-            if avg_popularity > 80:
-                return {
-                    'mood': 'Infectious & Chart-Topping',
-                    'complexity': 35,
-                    'recommendations': [
-                        f"{artist_name} masters the art of irresistible pop hooks and mainstream appeal",
-                        f"Expertly crafted singles designed to dominate charts and playlists worldwide",
-                        f"The soundtrack to your best memories - instantly recognizable and eternally catchy"
-                    ]
-                }
-            else:
-                return {
-                    'mood': 'Quirky & Alternative',
-                    'complexity': 50,
-                    'recommendations': [
-                        f"{artist_name} offers refreshing pop sensibilities with unique artistic vision",
-                        f"Accessible yet distinctive - pop music for listeners who crave something different",
-                        f"Hidden gems that deserve more recognition in the mainstream landscape"
-                    ]
-                }
-        
-        # Electronic/EDM Analysis
-        elif any(g in genre_str for g in ['electronic', 'edm', 'techno', 'house', 'dubstep']):
-            return {
-                'mood': 'Euphoric & Atmospheric',
-                'complexity': 55,
-                'recommendations': [
-                    f"{artist_name} creates immersive electronic soundscapes perfect for both clubs and headphones",
-                    f"Cutting-edge production with beats that make your pulse sync to the rhythm",
-                    f"Digital artistry that transforms simple sounds into transcendent musical experiences"
-                ]
-            }
-        
-        # Jazz Analysis
-        elif any(g in genre_str for g in ['jazz', 'blues', 'swing']):
-            return {
-                'mood': 'Sophisticated & Timeless',
-                'complexity': 85,
-                'recommendations': [
-                    f"{artist_name} upholds jazz tradition while pushing musical boundaries with technical excellence",
-                    f"Complex harmonies and improvisation showcase decades of musical evolution",
-                    f"For connoisseurs who appreciate the intersection of technical skill and emotional expression"
-                ]
-            }
-        
-        # Country Analysis
-        elif any(g in genre_str for g in ['country', 'folk', 'americana']):
-            return {
-                'mood': 'Authentic & Storytelling',
-                'complexity': 45,
-                'recommendations': [
-                    f"{artist_name} weaves compelling narratives through authentic country musicianship",
-                    f"Honest songwriting that captures the essence of human experience and rural life",
-                    f"Traditional values meet modern production in music that speaks to the heart"
-                ]
-            }
-        
-        # Indie Analysis
-        elif any(g in genre_str for g in ['indie', 'alternative', 'art']):
-            return {
-                'mood': 'Creative & Unconventional',
-                'complexity': 65,
-                'recommendations': [
-                    f"{artist_name} challenges musical conventions with innovative indie artistry",
-                    f"Experimental approach that prioritizes artistic integrity over commercial success",
-                    f"For listeners who value creativity and authenticity above mainstream trends"
-                ]
-            }
-        
-        # Classical/Ambient Analysis
-        elif any(g in genre_str for g in ['classical', 'ambient', 'new age', 'instrumental']):
-            return {
-                'mood': 'Meditative & Cinematic',
-                'complexity': 80,
-                'recommendations': [
-                    f"{artist_name} creates expansive soundscapes that transport listeners to otherworldly realms",
-                    f"Atmospheric compositions perfect for meditation, focus, and emotional reflection",
-                    f"Instrumental mastery that speaks without words and heals without medicine"
-                ]
-            }
-        
-        # Default/Mixed Genre Analysis
-        else:
-            return {
-                'mood': 'Eclectic & Versatile',
-                'complexity': 55,
-                'recommendations': [
-                    f"{artist_name} defies easy categorization with a diverse and dynamic musical approach",
-                    f"Genre-blending artistry that keeps listeners guessing and always engaged",
-                    f"Musical chameleon who adapts styles while maintaining a distinctive artistic voice"
-                ]
-            }
-    
-    def _get_genre_based_analysis(self, genre_str, avg_popularity, explicit_ratio, artist_name):
-        
-        # R&B/Soul Analysis
-        if any(g in genre_str for g in ['r&b', 'rnb', 'soul', 'neo-soul']):
-            return {
-                'mood': 'Smooth & Soulful',
-                'complexity': 70,
-                'recommendations': [
-                    f"{artist_name} crafts emotionally rich R&B with sophisticated vocal arrangements",
-                    f"Expect smooth grooves and intimate storytelling that defines modern soul music",
-                    f"Perfect for late-night listening with emphasis on vocal prowess and melodic depth"
-                ]
-            }
-        
-        # Hip-Hop/Rap Analysis
-        elif any(g in genre_str for g in ['hip-hop', 'rap', 'trap', 'drill']):
-            if explicit_ratio > 0.7:
-                mood_desc = "Raw & Unfiltered"
-                recs = [
-                    f"{artist_name} delivers hard-hitting rap with uncompromising lyrical content",
-                    f"Authentic street narratives with aggressive production and powerful delivery",
-                    f"Not for the faint-hearted - expect intense themes and bold artistic expression"
-                ]
-            else:
-                mood_desc = "Lyrical & Conscious"
-                recs = [
-                    f"{artist_name} represents conscious rap with thoughtful wordplay and social commentary",
-                    f"Intelligent hip-hop that balances mainstream appeal with lyrical substance",
-                    f"Family-friendly rap that proves you can be profound without profanity"
-                ]
-            return {
-                'mood': mood_desc,
-                'complexity': 65,
-                'recommendations': recs
-            }
-        
-        # Rock Analysis
-        elif any(g in genre_str for g in ['rock', 'metal', 'punk', 'grunge']):
-            if 'metal' in genre_str or 'punk' in genre_str:
-                return {
-                    'mood': 'Intense & Aggressive',
-                    'complexity': 75,
-                    'recommendations': [
-                        f"{artist_name} unleashes raw power through crushing riffs and aggressive vocals",
-                        f"High-energy music that channels rebellion and emotional intensity",
-                        f"Not background music - demands your full attention and respect"
-                    ]
-                }
-            else:
-                return {
-                    'mood': 'Energetic & Anthemic',
-                    'complexity': 60,
-                    'recommendations': [
-                        f"{artist_name} delivers classic rock energy with memorable hooks and guitar-driven sound",
-                        f"Stadium-worthy anthems that blend technical skill with mass appeal",
-                        f"Perfect for road trips and moments when you need to feel invincible"
-                    ]
-                }
-        
-        # Pop Analysis
-        elif any(g in genre_str for g in ['pop', 'dance-pop', 'electropop']):
-            if avg_popularity > 80:
-                return {
-                    'mood': 'Infectious & Chart-Topping',
-                    'complexity': 35,
-                    'recommendations': [
-                        f"{artist_name} masters the art of irresistible pop hooks and mainstream appeal",
-                        f"Expertly crafted singles designed to dominate charts and playlists worldwide",
-                        f"The soundtrack to your best memories - instantly recognizable and eternally catchy"
-                    ]
-                }
-            else:
-                return {
-                    'mood': 'Quirky & Alternative',
-                    'complexity': 50,
-                    'recommendations': [
-                        f"{artist_name} offers refreshing pop sensibilities with unique artistic vision",
-                        f"Accessible yet distinctive - pop music for listeners who crave something different",
-                        f"Hidden gems that deserve more recognition in the mainstream landscape"
-                    ]
-                }
-        
-        # Electronic/EDM Analysis
-        elif any(g in genre_str for g in ['electronic', 'edm', 'techno', 'house', 'dubstep']):
-            return {
-                'mood': 'Euphoric & Atmospheric',
-                'complexity': 55,
-                'recommendations': [
-                    f"{artist_name} creates immersive electronic soundscapes perfect for both clubs and headphones",
-                    f"Cutting-edge production with beats that make your pulse sync to the rhythm",
-                    f"Digital artistry that transforms simple sounds into transcendent musical experiences"
-                ]
-            }
-        
-        # Jazz Analysis
-        elif any(g in genre_str for g in ['jazz', 'blues', 'swing']):
-            return {
-                'mood': 'Sophisticated & Timeless',
-                'complexity': 85,
-                'recommendations': [
-                    f"{artist_name} upholds jazz tradition while pushing musical boundaries with technical excellence",
-                    f"Complex harmonies and improvisation showcase decades of musical evolution",
-                    f"For connoisseurs who appreciate the intersection of technical skill and emotional expression"
-                ]
-            }
-        
-        # Country Analysis
-        elif any(g in genre_str for g in ['country', 'folk', 'americana']):
-            return {
-                'mood': 'Authentic & Storytelling',
-                'complexity': 45,
-                'recommendations': [
-                    f"{artist_name} weaves compelling narratives through authentic country musicianship",
-                    f"Honest songwriting that captures the essence of human experience and rural life",
-                    f"Traditional values meet modern production in music that speaks to the heart"
-                ]
-            }
-        
-        # Indie Analysis
-        elif any(g in genre_str for g in ['indie', 'alternative', 'art']):
-            return {
-                'mood': 'Creative & Unconventional',
-                'complexity': 65,
-                'recommendations': [
-                    f"{artist_name} challenges musical conventions with innovative indie artistry",
-                    f"Experimental approach that prioritizes artistic integrity over commercial success",
-                    f"For listeners who value creativity and authenticity above mainstream trends"
-                ]
-            }
-        
-        # Classical/Ambient Analysis
-        elif any(g in genre_str for g in ['classical', 'ambient', 'new age', 'instrumental']):
-            return {
-                'mood': 'Meditative & Cinematic',
-                'complexity': 80,
-                'recommendations': [
-                    f"{artist_name} creates expansive soundscapes that transport listeners to otherworldly realms",
-                    f"Atmospheric compositions perfect for meditation, focus, and emotional reflection",
-                    f"Instrumental mastery that speaks without words and heals without medicine"
-                ]
-            }
-        
-        # Default/Mixed Genre Analysis
-        else:
-            return {
-                'mood': 'Eclectic & Versatile',
-                'complexity': 55,
-                'recommendations': [
-                    f"{artist_name} defies easy categorization with a diverse and dynamic musical approach",
-                    f"Genre-blending artistry that keeps listeners guessing and always engaged",
-                    f"Musical chameleon who adapts styles while maintaining a distinctive artistic voice"
-                ]
-            }
+        analysis = content['genre_analysis'][variant]
+        return {
+            'mood': analysis['mood'],
+            'complexity': analysis['complexity'],
+            'recommendations': [r.format(artist_name=artist_name) for r in analysis['recommendations']]
+        }
 
     def _generate_smart_recommendations(self, artist_name, genres, avg_popularity, explicit_ratio, avg_duration, album_years, total_tracks):
         """Generate truly unique recommendations based on artist's specific characteristics"""
         recommendations = []
-        genre_str = ', '.join(genres).lower() if genres else ''
+        genre_buckets = music_content.get()['genre_classifier'].classify(genres or [])
         
         # Artist name analysis for context
         name_lower = artist_name.lower() if artist_name else ''
         
         # Unique genre + popularity combinations
-        if 'pop' in genre_str:
+        if 'pop' in genre_buckets:
             if avg_popularity > 80:
                 recommendations.append(f"{artist_name} dominates mainstream charts - perfect for discovering what's defining pop culture right now")
             elif avg_popularity < 40:
@@ -737,7 +1601,7 @@ class MusicIntelligenceEngine:
             else:
                 recommendations.append(f"{artist_name} balances commercial appeal with artistic integrity - ideal for sophisticated pop lovers")
         
-        elif any(g in genre_str for g in ['rock', 'metal', 'punk']):
+        elif genre_buckets & {'rock', 'metal'}:
             if explicit_ratio > 0.6:
                 recommendations.append(f"Raw, unfiltered energy - {artist_name} delivers authentic rock expression without compromise")
             elif avg_duration > 300000:  # 5+ minutes
@@ -745,7 +1609,7 @@ class MusicIntelligenceEngine:
             else:
                 recommendations.append(f"{artist_name} channels classic rock spirit into modern accessibility")
         
-        elif any(g in genre_str for g in ['hip-hop', 'rap', 'trap']):
+        elif 'hip_hop' in genre_buckets:
             if explicit_ratio > 0.7:
                 recommendations.append(f"Authentic street narratives - {artist_name} represents uncompromising hip-hop storytelling")
             elif avg_popularity > 75:
@@ -753,22 +1617,22 @@ class MusicIntelligenceEngine:
             else:
                 recommendations.append(f"{artist_name} delivers lyrical depth beyond mainstream hip-hop trends")
         
-        elif any(g in genre_str for g in ['country', 'folk', 'americana']):
+        elif 'country' in genre_buckets:
             if album_years and len(album_years) > 5:
                 recommendations.append(f"Generational storyteller - {artist_name} chronicles American life across decades")
             else:
                 recommendations.append(f"{artist_name} preserves authentic country traditions while speaking to modern experiences")
         
-        elif any(g in genre_str for g in ['electronic', 'techno', 'house', 'edm']):
+        elif 'electronic' in genre_buckets:
             if avg_duration > 360000:  # 6+ minutes
                 recommendations.append(f"Immersive sonic architect - {artist_name} builds extended electronic landscapes for deep listening")
             else:
                 recommendations.append(f"{artist_name} masters electronic precision perfect for both clubs and personal listening")
         
-        elif any(g in genre_str for g in ['jazz', 'blues', 'soul']):
+        elif genre_buckets & {'jazz', 'rnb'}:
             recommendations.append(f"Musical sophistication - {artist_name} represents timeless artistry for discerning listeners")
         
-        elif any(g in genre_str for g in ['indie', 'alternative']):
+        elif 'indie' in genre_buckets:
             if avg_popularity < 50:
                 recommendations.append(f"Indie discovery - {artist_name} offers authentic artistry away from commercial pressures")
             else:
@@ -780,7 +1644,7 @@ class MusicIntelligenceEngine:
             if career_span > 15:
                 recommendations.append(f"Legendary consistency - {artist_name} represents decades of musical evolution and mastery")
             elif career_span < 3:
-                recommendations.append(f"Rising force - {artist_name} showcases the future direction of {genre_str.split(',')[0] if genre_str else 'music'}")
+                recommendations.append(f"Rising force - {artist_name} showcases the future direction of {genres[0].lower() if genres else 'music'}")
         
         # Track quantity insights
         if total_tracks > 15:
@@ -803,29 +1667,10 @@ class MusicIntelligenceEngine:
     
     def _calculate_audio_statistics(self, features_list):
         """Calculate detailed audio feature statistics"""
-        feature_keys = ['danceability', 'energy', 'valence', 'acousticness', 
-                       'instrumentalness', 'liveness', 'speechiness', 'tempo']
-        
-        stats = {}
-        for key in feature_keys:
-            values = [f[key] for f in features_list if f.get(key) is not None]
-            if values:
-                stats[key] = {
-                    'mean': sum(values) / len(values),
-                    'min': min(values),
-                    'max': max(values),
-                    'std': self._calculate_std(values)
-                }
-        
-        return stats
-    
-    def _calculate_std(self, values):
-        """Calculate standard deviation"""
-        if len(values) < 2:
-            return 0
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        return variance ** 0.5
+        return {
+            key: {stat: summary[stat] for stat in ('mean', 'min', 'max', 'std')}
+            for key, summary in compute_feature_statistics(features_list, AUDIO_FEATURE_KEYS).items()
+        }
     
     def _generate_advanced_mood_profile(self, audio_stats):
         """Generate sophisticated mood profile"""
@@ -869,10 +1714,15 @@ class MusicIntelligenceEngine:
         complexity_score = base_score + sum(complexity_factors.values())
         return min(max(complexity_score, 0), 100)
     
-    def generate_discovery_insights(self, artist_name, genres, audio_analysis):
-        """Generate advanced discovery insights"""
+    def generate_discovery_insights(self, artist_name, genres, audio_analysis, artist_id=None):
+        """Generate advanced discovery insights.
+
+        Deterministic for a given artist and ANALYSIS_VERSION, so results can be
+        memoized and ETagged.
+        """
+        rng = self._seeded_rng(artist_id or artist_name)
         insights = {
-            'discoverability_score': self._calculate_discoverability(audio_analysis, genres),
+            'discoverability_score': self._calculate_discoverability(audio_analysis, genres, rng),
             'genre_diversity': len(set(genres)) if genres else 0,
             'mainstream_appeal': self._calculate_mainstream_appeal(audio_analysis),
             'uniqueness_factor': self._calculate_uniqueness(audio_analysis, genres),
@@ -881,10 +1731,19 @@ class MusicIntelligenceEngine:
         
         return insights
     
-    def _calculate_discoverability(self, audio_analysis, genres):
+    def rules_version(self):
+        """Version of the analysis rules: engine code plus the loaded music content"""
+        return f"{self.ANALYSIS_VERSION}:{music_content.get()['version']}"
+    
+    def _seeded_rng(self, artist_key):
+        """Random generator seeded from the artist and ANALYSIS_VERSION (stable across processes)"""
+        seed = hashlib.sha256(f"{artist_key}:{self.ANALYSIS_VERSION}".encode('utf-8')).digest()
+        return random.Random(int.from_bytes(seed[:8], 'big'))
+    
+    def _calculate_discoverability(self, audio_analysis, genres, rng):
         """Calculate how discoverable this artist is (0-100)"""
         if not audio_analysis:
-            return random.randint(60, 90)
+            return rng.randint(60, 90)
         
         base_score = 50
         popularity = audio_analysis.get('audio_features', {}).get('avg_popularity', 50)
@@ -892,8 +1751,8 @@ class MusicIntelligenceEngine:
         # Popular artists are more discoverable
         discovery_score = min(int(popularity * 1.3), 95)
         
-        # Add some randomness for variety
-        discovery_score += random.randint(-10, 15)
+        # Add some per-artist variety
+        discovery_score += rng.randint(-10, 15)
         
         return max(min(discovery_score, 100), 30)  # Keep between 30-100
         
@@ -985,82 +1844,488 @@ def get_artist_title(artist_name, genres):
     artist_lower = artist_name.lower() if artist_name else ''
     
     # Famous artist titles
-    artist_titles = {
-        'michael jackson': 'The King of Pop',
-        'elvis presley': 'The King of Rock and Roll',
-        'taylor swift': 'The Songwriting Mastermind',
-        'beyoncé': 'Queen B',
-        'beyonce': 'Queen B',
-        'drake': 'The 6 God',
-        'kendrick lamar': 'The Rap Genius',
-        'kanye west': 'Yeezy',
-        'ye': 'Yeezy',
-        'yeat': 'The Bell King',
-        'travis scott': 'La Flame',
-        'the beatles': 'The Fab Four',
-        'queen': 'Rock Royalty',
-        'led zeppelin': 'The Masters of Hard Rock',
-        'whitney houston': 'The Voice',
-        'stevie wonder': 'The Genius',
-        'billie eilish': 'The Dark Pop Princess',
-        'the weeknd': 'The Nocturnal King',
-        'dua lipa': 'The Disco Revival Queen',
-        'daft punk': 'The Robot Legends',
-        'skrillex': 'The Bass Drop King',
-        'johnny cash': 'The Man in Black',
-        'radiohead': 'The Experimental Masters',
-        'nirvana': 'The Grunge Pioneers',
-        'adele': 'The Soul Powerhouse',
-        'bruno mars': 'The Showman',
-        'ed sheeran': 'The Loop Pedal Virtuoso',
-        'eminem': 'Slim Shady',
-        'jay-z': 'HOV',
-        'tupac': 'The Prophet',
-        'biggie': 'The Notorious B.I.G.',
-        'prince': 'The Purple One',
-        'madonna': 'The Queen of Pop',
-        'bob dylan': 'The Voice of a Generation',
-        'aretha franklin': 'The Queen of Soul',
-        'marvin gaye': 'The Prince of Soul',
-        'frank sinatra': 'Ol\' Blue Eyes',
-        'david bowie': 'The Starman',
-        'jimi hendrix': 'The Guitar God',
-        'bob marley': 'The Reggae Legend',
-        'john lennon': 'The Dreamer',
-        'freddie mercury': 'The Showman Supreme'
-    }
+    content = music_content.get()
+    title = content['title_matcher'].match(artist_lower)
+    if title:
+        return title
     
-    # Check for exact matches first
-    for artist_key, title in artist_titles.items():
-        if artist_key in artist_lower:
-            return title
-    
-    # Generate title based on genres if no specific title found
+    # Generate title based on the primary genre if no specific title found
     if genres:
-        primary_genre = genres[0].lower()
-        if 'pop' in primary_genre:
+        primary_buckets = content['genre_classifier'].classify(genres[:1])
+        if 'pop' in primary_buckets:
             return 'Pop Sensation'
-        elif 'rap' in primary_genre or 'hip-hop' in primary_genre:
+        elif 'hip_hop' in primary_buckets:
             return 'Hip-Hop Artist'
-        elif 'rock' in primary_genre:
+        elif primary_buckets & {'rock', 'metal'}:
             return 'Rock Legend'
-        elif 'r&b' in primary_genre or 'soul' in primary_genre:
+        elif 'rnb' in primary_buckets:
             return 'R&B Star'
-        elif 'country' in primary_genre:
+        elif 'country' in primary_buckets:
             return 'Country Artist'
-        elif 'electronic' in primary_genre or 'edm' in primary_genre:
+        elif 'electronic' in primary_buckets:
             return 'Electronic Producer'
-        elif 'jazz' in primary_genre:
+        elif 'jazz' in primary_buckets:
             return 'Jazz Virtuoso'
-        elif 'indie' in primary_genre or 'alternative' in primary_genre:
+        elif 'indie' in primary_buckets:
             return 'Indie Artist'
     
     return 'Musical Artist'  # Default fallback
 
+def timed_stage(stage_timings, stage, fn, *args, **kwargs):
+    """Call fn, record its wall-clock duration in milliseconds under stage
+    and observe it in the stage_latency histogram"""
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_timings[stage] = round(elapsed * 1000, 1)
+        stage_latency.observe(elapsed, stage)
+
+def remaining_time(request_start):
+    """Seconds left before the per-search deadline (never negative)"""
+    return max(Config.SEARCH_DEADLINE - (time.perf_counter() - request_start), 0)
+
+def fetch_audio_features(track_ids, batch_size=None):
+    """Fetch audio features for many tracks in as few Spotify calls as possible.
+
+    Tracks are requested in batches of up to ``batch_size`` IDs. A batch
+    rejected with 400 (a bad track ID) is bisected so that the bad ID only
+    costs the tracks around it; any other error (404, 429, 5xx, access
+    errors) applies to the whole endpoint, so the batch is recorded as failed
+    without retrying its halves. Calls go through
+    ``audio_features_breaker`` so the stage is skipped while the circuit is open.
+
+    Returns a tuple of (features, failed_track_ids).
+    """
+    batch_size = batch_size or Config.AUDIO_FEATURES_BATCH_SIZE
+    features = []
+    failed_tracks = []
+    pending = [track_ids[i:i + batch_size] for i in range(0, len(track_ids), batch_size)]
+
+    while pending:
+        # Stop early (and skip the stage entirely) while the endpoint is known to be failing
+        if not audio_features_breaker.allow_request():
+            logger.debug(f"Audio features circuit open; skipping {sum(len(b) for b in pending)} track(s)")
+            break
+        
+        batch = pending.pop(0)
+        try:
+            results = sp.audio_features(batch)
+        except spotipy.exceptions.SpotifyException as e:
+            # 400 means a bad track ID, not an unhealthy endpoint
+            if e.http_status == 400:
+                audio_features_breaker.record_success()
+            else:
+                audio_features_breaker.record_failure()
+            if len(batch) == 1 or e.http_status != 400:
+                logger.warning(f"Skipping {len(batch)} track(s) due to Spotify API error: {e}")
+                failed_tracks.extend(batch)
+            else:
+                middle = len(batch) // 2
+                pending[:0] = [batch[:middle], batch[middle:]]
+            continue
+        except Exception as e:
+            # Timeouts and connection errors: the endpoint is unhealthy for the whole batch
+            audio_features_breaker.record_failure()
+            logger.warning(f"Skipping {len(batch)} track(s) due to audio features request error: {e}")
+            failed_tracks.extend(batch)
+            continue
+
+        audio_features_breaker.record_success()
+        features.extend(f for f in (results or []) if f is not None)
+
+    return features, failed_tracks
+
+def fetch_artist_details(artist_ids):
+    """Look up display details for many artists, using artist_details_cache
+    and batched sp.artists calls for the misses.
+
+    Returns a dict of artist_id -> details for every artist that could be fetched.
+    """
+    details = {}
+    missing = []
+    for artist_id in artist_ids:
+        cached = artist_details_cache.get(artist_id)
+        if cached is not None:
+            details[artist_id] = cached
+        else:
+            missing.append(artist_id)
+    
+    batch_size = Config.ARTISTS_BATCH_SIZE
+    for i in range(0, len(missing), batch_size):
+        batch = missing[i:i + batch_size]
+        try:
+            results = sp.artists(batch)
+        except spotipy.exceptions.SpotifyException as e:
+            logger.warning(f"Could not fetch {len(batch)} artist(s): {e}")
+            continue
+        for artist_info in results.get('artists', []):
+            if not artist_info:
+                continue
+            artist_details = {
+                'artist_name': artist_info['name'],
+                'image': artist_info['images'][0]['url'] if artist_info['images'] else None,
+                'popularity': artist_info['popularity'],
+                'genres': artist_info['genres']
+            }
+            artist_details_cache.set(artist_info['id'], artist_details)
+            details[artist_info['id']] = artist_details
+    
+    return details
+
+ALBUM_TYPES = ('album', 'single', 'appears_on', 'compilation')
+
+def normalize_album_type(album_type):
+    """Canonical comma-separated album_type filter, or None if it is invalid"""
+    types = sorted({t.strip().lower() for t in (album_type or 'album').split(',') if t.strip()})
+    if not types or any(t not in ALBUM_TYPES for t in types):
+        return None
+    return ','.join(types)
+
+def encode_album_cursor(album_type, offset, fetched_at):
+    """Cursor for the page at offset; fetched_at is when page 0 of the listing was loaded"""
+    payload = json.dumps(
+        {'album_type': album_type, 'offset': offset, 'fetched_at': fetched_at}, separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_album_cursor(cursor):
+    """Return (album_type, offset, fetched_at) for a cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        album_type, offset, fetched_at = payload['album_type'], payload['offset'], payload['fetched_at']
+    except (UnicodeEncodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed cursor: {e}")
+    if (not isinstance(offset, int) or offset < 0 or normalize_album_type(album_type) != album_type
+            or isinstance(fetched_at, bool) or not isinstance(fetched_at, (int, float))
+            or not math.isfinite(fetched_at)):
+        raise ValueError("Malformed cursor")
+    return album_type, offset, fetched_at
+
+def format_album(album):
+    """Display fields for an album returned by Spotify"""
+    return {
+        'id': album['id'],
+        'name': album['name'],
+        'artist': album['artists'][0]['name'],
+        'image': album['images'][0]['url'] if album['images'] else None,
+        'release_date': album['release_date'],
+        'total_tracks': album['total_tracks'],
+        'spotify_url': album['external_urls']['spotify'],
+        'album_type': album.get('album_type', 'album')
+    }
+
+def fetch_album_page(artist_id, album_type, offset, refresh=False, not_before=None):
+    """One page of an artist's discography, cached per artist/album_type/offset.
+
+    Returns {'albums', 'total', 'next_offset', 'fetched_at'}; next_offset is
+    None on the last page. album_pages_cache is the only cache for these pages
+    (artist_albums is not in SPOTIFY_CACHE_TTLS), so fetched_at is when Spotify
+    was actually asked. A cached page fetched before not_before (the page 0
+    time carried in a cursor) is treated as a miss, so a listing is never
+    stitched from pages older than its first one. Concurrent loads of the same
+    page (e.g. a prefetch and a client request) share one Spotify call.
+    refresh=True skips the cache and stores the page it fetched.
+    """
+    key = f"albums:{artist_id}:{album_type}:{offset}"
+    if not refresh:
+        page = album_pages_cache.get(key)
+        if page is not None and (not_before is None or page['fetched_at'] >= not_before):
+            return page
+    
+    def load_page():
+        result = call_spotify(
+            'artist_albums', artist_id, album_type=album_type,
+            limit=Config.ALBUMS_PAGE_SIZE, offset=offset
+        )
+        next_offset = offset + Config.ALBUMS_PAGE_SIZE
+        loaded = {
+            'albums': [format_album(album) for album in result['items'] if album['total_tracks'] > 0],
+            'total': result.get('total', 0),
+            'next_offset': next_offset if result.get('next') and next_offset < result.get('total', 0) else None,
+            'fetched_at': time.time()
+        }
+        album_pages_cache.set(key, loaded)
+        return loaded
+    
+    return album_page_flights.do(f"{key}:refresh" if refresh else key, load_page)
+
+def prefetch_album_pages(artist_id, album_type, next_offset, total, not_before):
+    """Warm the next Config.ALBUMS_PREFETCH_PAGES pages in the background,
+    refetching any cached page older than not_before (the listing's page 0)"""
+    if next_offset is None:
+        return
+    for page_number in range(Config.ALBUMS_PREFETCH_PAGES):
+        offset = next_offset + page_number * Config.ALBUMS_PAGE_SIZE
+        if offset >= total:
+            break
+        cached = album_pages_cache.get(f"albums:{artist_id}:{album_type}:{offset}")
+        if cached is None or cached['fetched_at'] < not_before:
+            prefetch_executor.submit(_prefetch_album_page, artist_id, album_type, offset, not_before)
+
+def _prefetch_album_page(artist_id, album_type, offset, not_before):
+    try:
+        fetch_album_page(artist_id, album_type, offset, not_before=not_before)
+    except Exception as e:
+        logger.warning(f"Album page prefetch failed for {artist_id} at offset {offset}: {e}")
+
+def fetch_top_track_features(artist_id, stage_timings, refresh=False):
+    """Fetch an artist's top tracks and their audio features (runs on spotify_executor)"""
+    top_tracks = timed_stage(
+        stage_timings, 'top_tracks', call_spotify, 'artist_top_tracks', artist_id, country='US', refresh=refresh
+    )
+    top_track_ids = [track['id'] for track in top_tracks['tracks'][:20] if track.get('id')]
+    all_audio_features, failed_tracks = timed_stage(
+        stage_timings, 'audio_features', fetch_audio_features, top_track_ids
+    )
+    return top_tracks, all_audio_features, failed_tracks
+
+def analysis_fingerprint(tracks, genres, albums, artist_name):
+    """Cheap digest of exactly the inputs analyze_audio_features reads"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((
+        artist_name,
+        tuple(genres or ()),
+        tuple(tuple(track.get(key) for key in TRACK_METADATA_KEYS) for track in tracks),
+        tuple(album.get('release_date') for album in albums or ())
+    )).encode('utf-8'))
+    return digest.hexdigest()
+
+def analyze_artist(artist_id, tracks, genres, albums, artist_name, stage_timings):
+    """Return (music_analysis, discovery_insights), memoized per artist.
+
+    Entries are keyed by artist ID, a fingerprint of the analysis inputs and
+    the engine rules version, so unchanged artists skip analysis entirely and
+    rule or content changes miss instead of serving stale results.
+    """
+    key = (
+        f"analysis:{artist_id}:{music_ai.rules_version()}:"
+        f"{analysis_fingerprint(tracks, genres, albums, artist_name)}"
+    )
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached['music_analysis'], cached['discovery_insights']
+    
+    music_analysis = timed_stage(
+        stage_timings, 'analyze_audio_features', music_ai.analyze_audio_features,
+        tracks, genres=genres, albums=albums, artist_name=artist_name
+    )
+    discovery_insights = timed_stage(
+        stage_timings, 'generate_discovery_insights', music_ai.generate_discovery_insights,
+        artist_name, genres, music_analysis, artist_id=artist_id
+    )
+    analysis_cache.set(key, {'music_analysis': music_analysis, 'discovery_insights': discovery_insights})
+    return music_analysis, discovery_insights
+
+def build_artist_payload(artist, stage_timings, request_start, refresh=False):
+    """Fetch albums, top tracks and audio features for a resolved artist and
+    build the /api/search response payload.
+
+    refresh=True refetches albums and top tracks past their caches (audio
+    features never change, so those stay cached). Raises FuturesTimeoutError
+    if the Spotify fan-out misses the search deadline.
+    """
+    artist_id = artist['id']
+    artist_name = artist['name']
+    
+    # Albums and top tracks (plus their audio features) are independent,
+    # so fetch them concurrently within the per-search deadline
+    albums_future = spotify_executor.submit(
+        timed_stage, stage_timings, 'albums',
+        fetch_album_page, artist_id, 'album', 0, refresh=refresh
+    )
+    tracks_future = spotify_executor.submit(fetch_top_track_features, artist_id, stage_timings, refresh=refresh)
+    
+    try:
+        album_page = albums_future.result(timeout=remaining_time(request_start))
+        top_tracks, all_audio_features, failed_tracks = tracks_future.result(
+            timeout=remaining_time(request_start)
+        )
+    except FuturesTimeoutError:
+        albums_future.cancel()
+        tracks_future.cancel()
+        raise
+
+    # First page of albums; the rest of the discography is paged via
+    # /api/artist/<id>/albums, warmed here ahead of the client
+    albums = album_page['albums']
+    prefetch_album_pages(
+        artist_id, 'album', album_page['next_offset'], album_page['total'], album_page['fetched_at']
+    )
+
+    # If no audio features could be fetched, fall back to using available top track data
+    if not all_audio_features:
+        logger.warning("No audio features available from Spotify API; using top track metadata for analysis.")
+        # Use only basic info from top_tracks for a minimal analysis
+        all_audio_features = [
+            {
+                'id': t['id'],
+                'popularity': t.get('popularity'),
+                'duration_ms': t.get('duration_ms'),
+                'explicit': t.get('explicit'),
+                'name': t.get('name'),
+            }
+            for t in top_tracks['tracks'][:20] if t.get('id')
+        ]
+
+    # Generate AI insights using robust metadata-based analysis
+    artist_genres = artist.get('genres', [])
+    music_analysis, discovery_insights = analyze_artist(
+        artist_id, all_audio_features, artist_genres, albums, artist_name, stage_timings
+    )
+    
+    response_data = {
+        'success': True,
+        'artist': {
+            'id': artist_id,
+            'name': artist_name,
+            'title': get_artist_title(artist_name, artist_genres),
+            'genres': artist_genres,
+            'primary_genre': artist_genres[0] if artist_genres else 'Unknown',
+            'followers': artist.get('followers', {}).get('total', 0),
+            'popularity': artist.get('popularity', 0),
+            'image': artist['images'][0]['url'] if artist['images'] else None
+        },
+        'albums': albums,
+        'music_analysis': music_analysis,
+        'discovery_insights': discovery_insights,
+        'total_results': len(albums),
+        'total_albums': album_page['total'],
+        'albums_next_cursor': (
+            encode_album_cursor('album', album_page['next_offset'], album_page['fetched_at'])
+            if album_page['next_offset'] is not None else None
+        ),
+        'search_timestamp': datetime.now().isoformat()
+    }
+    
+    return response_data
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_timing(response):
+    """Observe endpoint latency and expose stage timings (Server-Timing) and cache freshness"""
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    request_latency.observe(elapsed, request.endpoint or 'unmatched', request.method, response.status_code)
+    
+    timings = [f"{stage};dur={ms}" for stage, ms in g.get('stage_timings', {}).items() if stage != 'total']
+    timings.append(f"total;dur={round(elapsed * 1000, 1)}")
+    response.headers['Server-Timing'] = ', '.join(timings)
+    
+    freshness = g.get('cache_freshness')
+    if freshness:
+        response.headers['X-Cache-Freshness'] = freshness
+        response.headers['X-Cache-Age'] = str(int(g.get('cache_age') or 0))
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (per worker process)"""
+    body = stage_latency.render() + request_latency.render() + (
+        "# HELP album_finder_coalesced_requests_total Requests that joined an identical in-flight search or artist build\n"
+        "# TYPE album_finder_coalesced_requests_total counter\n"
+    ) + ''.join(
+        f'album_finder_coalesced_requests_total{{endpoint="{endpoint}"}} {count}\n'
+        for endpoint, count in sorted(coalesced_requests.items())
+    )
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def home():
     return render_template('index.html')
 
+_refreshing_artists = set()
+_refreshing_lock = threading.Lock()
+
+def cache_artist_payload(artist_id, payload):
+    """Store a payload, kept past its freshness for the stale-while-revalidate window"""
+    music_insights_cache.set(
+        f"artist:{artist_id}",
+        {'payload': payload, 'fetched_at': time.time()},
+        ttl=Config.INSIGHTS_CACHE_TTL + Config.ARTIST_MAX_STALENESS
+    )
+
+def lookup_artist_payload(artist_id):
+    """Return (payload, freshness, age_seconds) for a cached artist.
+
+    freshness is 'fresh', 'stale' (past INSIGHTS_CACHE_TTL; a background
+    refresh is scheduled) or None on a miss.
+    """
+    entry = music_insights_cache.get(f"artist:{artist_id}")
+    if entry is None:
+        return None, None, None
+    age = time.time() - entry['fetched_at']
+    if age < Config.INSIGHTS_CACHE_TTL:
+        return entry['payload'], 'fresh', age
+    schedule_artist_refresh(artist_id)
+    return entry['payload'], 'stale', age
+
+def schedule_artist_refresh(artist_id):
+    """Rebuild an artist payload in the background (at most one refresh per artist at a time)"""
+    with _refreshing_lock:
+        if artist_id in _refreshing_artists:
+            return
+        _refreshing_artists.add(artist_id)
+    refresh_executor.submit(_refresh_artist_payload, artist_id)
+
+def _refresh_artist_payload(artist_id):
+    try:
+        # Bypass the album page and Spotify response caches so the refreshed
+        # payload (reported as age 0) really is built from current data
+        artist = call_spotify('artist', artist_id, refresh=True)
+        cache_artist_payload(artist_id, build_artist_payload(artist, {}, time.perf_counter(), refresh=True))
+        logger.info(f"Refreshed stale payload for artist: {artist['name']}")
+    except Exception as e:
+        # The stale entry keeps being served until ARTIST_MAX_STALENESS runs out
+        logger.warning(f"Background refresh failed for artist {artist_id}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing_artists.discard(artist_id)
+
+def get_artist_payload(artist, stage_timings, request_start):
+    """Cached artist payload, building it (once across concurrent requests) on a miss.
+
+    Returns (payload, freshness, age_seconds) like lookup_artist_payload,
+    with freshness 'miss' when the payload was just built.
+    """
+    payload, freshness, age = lookup_artist_payload(artist['id'])
+    if payload is not None:
+        return payload, freshness, age
+    
+    def load_artist_payload():
+        built = build_artist_payload(artist, stage_timings, request_start)
+        cache_artist_payload(artist['id'], built)
+        return built
+    
+    return search_flights.do(f"artist:{artist['id']}", load_artist_payload, note_coalesced), 'miss', 0.0
+
+_QUERY_SEPARATORS = re.compile(r'[\W_]+')
+
+def normalize_query(query):
+    """Canonical form of a search query for analytics and cache keys.
+
+    Folds compatibility characters and accents (NFKD, combining marks
+    dropped), case-folds, and collapses runs of whitespace and punctuation
+    to single spaces, so "Beyoncé", "beyonce" and " BEYONCE " share a key.
+    Queries that are nothing but punctuation/symbols fall back to their
+    case-folded text.
+    """
+    decomposed = unicodedata.normalize('NFKD', query)
+    folded = ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return _QUERY_SEPARATORS.sub(' ', folded).strip() or query.casefold().strip()
+
+def set_cache_freshness(freshness, age):
+    """Report payload freshness in the X-Cache-Freshness/X-Cache-Age response headers"""
+    g.cache_freshness = freshness
+    g.cache_age = age
+
 @app.route('/api/search', methods=['POST'])
 @rate_limit(max_requests=30, window=3600)
 def search_albums():
@@ -1080,115 +2345,243 @@ def search_albums():
             return jsonify({'error': 'Search query too long'}), 400
         
         # Track search analytics
-        search_analytics[query.lower()] += 1
+        normalized_query = normalize_query(query)
+        search_analytics[normalized_query] += 1
+        
+        # Serve repeat lookups from memory before making any Spotify calls
+        request_start = time.perf_counter()
+        stage_timings = g.stage_timings = {}
+        query_key = f"query:{normalized_query}"
+        artist = None
+        known_artist_id = query_alias_index.get(query_key)
+        if known_artist_id:
+            cached_payload, freshness, age = lookup_artist_payload(known_artist_id)
+            if cached_payload:
+                set_cache_freshness(freshness, age)
+                stage_timings['total'] = round((time.perf_counter() - request_start) * 1000, 1)
+                logger.info(f"Cache hit ({freshness}) for artist: {cached_payload['artist']['name']} ({stage_timings})")
+                return timed_stage(stage_timings, 'json_serialization', jsonify,
+                                   dict(cached_payload, stage_timings_ms=stage_timings))
+            
+            # Known query whose payload has expired: fetch the artist directly instead of searching
+            try:
+                artist = timed_stage(stage_timings, 'artist_lookup', sp.artist, known_artist_id)
+            except spotipy.exceptions.SpotifyException as e:
+                logger.warning(f"Alias {normalized_query!r} -> {known_artist_id} lookup failed, searching instead: {e}")
+        
+        if artist is None:
+            # Skip Spotify for queries recently known to find nothing
+            maybe_negative = negative_query_filter is None or query_key in negative_query_filter
+            if maybe_negative and negative_query_cache.get(query_key):
+                logger.info(f"Negative cache hit for query: {query}")
+                return jsonify({'error': 'No artists found'}), 404
+            
+            # Search for artist and albums
+            search_results = timed_stage(
+                stage_timings, 'artist_search', search_flights.do, query_key,
+                lambda: sp.search(q=query, type='artist,album', limit=20), note_coalesced
+            )
+            
+            if not search_results['artists']['items']:
+                if negative_query_filter is not None:
+                    negative_query_filter.add(query_key)
+                negative_query_cache.set(query_key, True)
+                return jsonify({'error': 'No artists found'}), 404
+            
+            artist = search_results['artists']['items'][0]
+            query_alias_index.set(query_key, artist['id'])
+        
+        # A different query may already have resolved to this artist
+        try:
+            response_data, freshness, age = get_artist_payload(artist, stage_timings, request_start)
+            set_cache_freshness(freshness, age)
+        except FuturesTimeoutError:
+            logger.error(f"Search for {artist['name']} exceeded {Config.SEARCH_DEADLINE}s deadline: {stage_timings}")
+            return jsonify({'error': 'Music service timed out. Please try again.'}), 504
+        
+        stage_timings['total'] = round((time.perf_counter() - request_start) * 1000, 1)
+        logger.info(f"Successful search for artist: {artist['name']} ({stage_timings})")
+        return timed_stage(stage_timings, 'json_serialization', jsonify,
+                           dict(response_data, stage_timings_ms=stage_timings))
         
-        # Search for artist and albums
-        search_results = sp.search(q=query, type='artist,album', limit=20)
+    except spotipy.exceptions.SpotifyException as e:
+        logger.error(f"Spotify API error: {e}")
+        return jsonify({'error': 'Music service error. Please try again.'}), 502
         
-        if not search_results['artists']['items']:
-            return jsonify({'error': 'No artists found'}), 404
+    except Exception as e:
+        import traceback
+        logger.error(f"Unexpected error in search: {e}\n" + traceback.format_exc())
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/artist/<artist_id>')
+@rate_limit(max_requests=120, window=3600)
+def get_artist(artist_id):
+    """Canonical, HTTP-cacheable artist resource (same payload as /api/search).
+
+    Responses carry Cache-Control and a strong ETag over the body, and
+    If-None-Match revalidations are answered with 304.
+    """
+    try:
+        if not sp:
+            return jsonify({'error': 'Spotify service unavailable'}), 503
         
-        artist = search_results['artists']['items'][0]
-        artist_id = artist['id']
-        artist_name = artist['name']
+        request_start = time.perf_counter()
+        stage_timings = g.stage_timings = {}
+        payload, freshness, age = lookup_artist_payload(artist_id)
+        if payload is None:
+            try:
+                artist = timed_stage(stage_timings, 'artist_lookup', sp.artist, artist_id)
+            except spotipy.exceptions.SpotifyException as e:
+                if e.http_status in (400, 404):
+                    return jsonify({'error': 'Artist not found'}), 404
+                raise
+            try:
+                payload, freshness, age = get_artist_payload(artist, stage_timings, request_start)
+            except FuturesTimeoutError:
+                logger.error(f"Artist {artist_id} exceeded {Config.SEARCH_DEADLINE}s deadline: {stage_timings}")
+                return jsonify({'error': 'Music service timed out. Please try again.'}), 504
+        
+        # Timings go in Server-Timing only, so the body (and its ETag) is
+        # stable for the lifetime of the cached payload
+        response = timed_stage(stage_timings, 'json_serialization', jsonify, payload)
+        response.set_etag(hashlib.sha256(response.get_data()).hexdigest()[:32])
+        response.cache_control.public = True
+        # Stale payloads are being refreshed; don't let downstream caches hold on to them
+        response.cache_control.max_age = Config.ARTIST_RESOURCE_MAX_AGE if freshness != 'stale' else 0
+        set_cache_freshness(freshness, age)
+        return response.make_conditional(request)
         
-        # Get artist's albums
-        albums_result = sp.artist_albums(
-            artist_id,
-            album_type='album',
-            limit=50
-        )
+    except spotipy.exceptions.SpotifyException as e:
+        logger.error(f"Spotify API error fetching artist {artist_id}: {e}")
+        return jsonify({'error': 'Music service error. Please try again.'}), 502
+        
+    except Exception as e:
+        logger.error(f"Unexpected error fetching artist {artist_id}: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
 
-        # Process albums (for display only)
-        albums = []
-        for album in albums_result['items']:
-            if album['total_tracks'] > 0:
-                albums.append({
-                    'id': album['id'],
-                    'name': album['name'],
-                    'artist': album['artists'][0]['name'],
-                    'image': album['images'][0]['url'] if album['images'] else None,
-                    'release_date': album['release_date'],
-                    'total_tracks': album['total_tracks'],
-                    'spotify_url': album['external_urls']['spotify'],
-                    'album_type': album.get('album_type', 'album')
-                })
-
-        # Use only the artist's top 20 tracks for AI analysis
-        top_tracks = sp.artist_top_tracks(artist_id, country='US')
-        top_track_ids = [track['id'] for track in top_tracks['tracks'][:20] if track.get('id')]
-        all_audio_features = []
-        failed_tracks = []
-        if top_track_ids:
-            for track_id in top_track_ids:
-                try:
-                    features = sp.audio_features([track_id])
-                    if features and features[0] is not None:
-                        all_audio_features.append(features[0])
-                except spotipy.exceptions.SpotifyException as e:
-                    logger.warning(f"Skipping track {track_id} due to Spotify API error: {e}")
-                    failed_tracks.append(track_id)
-
-        # If no audio features could be fetched, fall back to using available top track data
-        if not all_audio_features:
-            logger.warning("No audio features available from Spotify API; using top track metadata for analysis.")
-            # Use only basic info from top_tracks for a minimal analysis
-            all_audio_features = [
-                {
-                    'id': t['id'],
-                    'popularity': t.get('popularity'),
-                    'duration_ms': t.get('duration_ms'),
-                    'explicit': t.get('explicit'),
-                    'name': t.get('name'),
-                }
-                for t in top_tracks['tracks'][:20] if t.get('id')
-            ]
-
-        # Generate AI insights using robust metadata-based analysis
-        artist_genres = artist.get('genres', [])
-        music_analysis = music_ai.analyze_audio_features(all_audio_features, genres=artist_genres, albums=albums, artist_name=artist_name)
-        discovery_insights = music_ai.generate_discovery_insights(
-            artist_name, artist_genres, music_analysis
+@app.route('/api/artist/<artist_id>/albums')
+@rate_limit(max_requests=200, window=3600)
+def artist_albums(artist_id):
+    """Page through an artist's full discography"""
+    if not sp:
+        return jsonify({'error': 'Spotify service unavailable'}), 503
+    
+    album_type = normalize_album_type(request.args.get('album_type'))
+    if album_type is None:
+        return jsonify({'error': f"album_type must be one or more of: {', '.join(ALBUM_TYPES)}"}), 400
+    
+    offset = 0
+    listing_fetched_at = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_album_type, offset, listing_fetched_at = decode_album_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if 'album_type' in request.args and cursor_album_type != album_type:
+            return jsonify({'error': 'Cursor does not match album_type'}), 400
+        album_type = cursor_album_type
+    
+    try:
+        page = fetch_album_page(artist_id, album_type, offset, not_before=listing_fetched_at)
+    except spotipy.exceptions.SpotifyException as e:
+        logger.error(f"Spotify API error fetching albums for {artist_id}: {e}")
+        if e.http_status in (400, 404):
+            return jsonify({'error': 'Artist not found'}), 404
+        return jsonify({'error': 'Music service error. Please try again.'}), 502
+    
+    prefetch_album_pages(
+        artist_id, album_type, page['next_offset'], page['total'], listing_fetched_at or page['fetched_at']
+    )
+    
+    return jsonify({
+        'success': True,
+        'artist_id': artist_id,
+        'album_type': album_type,
+        'albums': page['albums'],
+        'total': page['total'],
+        'next_cursor': (
+            encode_album_cursor(album_type, page['next_offset'], listing_fetched_at or page['fetched_at'])
+            if page['next_offset'] is not None else None
         )
+    })
+
+# Accepted range of each client-supplied track field (bools count as 0/1)
+TRACK_METADATA_RANGES = {
+    'popularity': (0, 100),
+    'duration_ms': (0, 24 * 3600 * 1000),
+    'explicit': (0, 1)
+}
+
+def valid_track_metadata(track):
+    """True if every TRACK_METADATA_KEYS field is None, a bool or a finite number in range"""
+    for key, (low, high) in TRACK_METADATA_RANGES.items():
+        value = track.get(key)
+        if value is None or isinstance(value, bool):
+            continue
+        if not isinstance(value, (int, float)) or not low <= value <= high:
+            return False  # NaN fails the comparison too
+    return True
+
+@app.route('/api/analyze/batch', methods=['POST'])
+@rate_limit(max_requests=20, window=3600)
+def analyze_batch():
+    """Analyze many artists from client-supplied track metadata in one request"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('artists'), list):
+            return jsonify({'error': 'Invalid request data'}), 400
         
-        # Cache insights
-        cache_key = hashlib.md5(f"{artist_id}_{datetime.now().date()}".encode()).hexdigest()
-        music_insights_cache[cache_key] = {
-            'analysis': music_analysis,
-            'insights': discovery_insights,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        response_data = {
-            'success': True,
-            'artist': {
-                'id': artist_id,
-                'name': artist_name,
-                'title': get_artist_title(artist_name, artist_genres),
-                'genres': artist_genres,
-                'primary_genre': artist_genres[0] if artist_genres else 'Unknown',
-                'followers': artist.get('followers', {}).get('total', 0),
-                'popularity': artist.get('popularity', 0),
-                'image': artist['images'][0]['url'] if artist['images'] else None
-            },
-            'albums': albums,
-            'music_analysis': music_analysis,
-            'discovery_insights': discovery_insights,
-            'total_results': len(albums),
-            'search_timestamp': datetime.now().isoformat()
-        }
+        artists = data['artists']
+        if not artists:
+            return jsonify({'error': 'At least one artist is required'}), 400
         
-        logger.info(f"Successful search for artist: {artist_name}")
-        return jsonify(response_data)
+        if len(artists) > Config.ANALYZE_BATCH_MAX_ARTISTS:
+            return jsonify({
+                'error': f'Too many artists (max {Config.ANALYZE_BATCH_MAX_ARTISTS} per request)'
+            }), 400
+        
+        batch = []
+        artist_ids = []
+        for artist in artists:
+            if not isinstance(artist, dict) or not artist.get('name'):
+                return jsonify({'error': 'Each artist needs a name'}), 400
+            tracks = artist.get('tracks') or []
+            genres = artist.get('genres') or []
+            albums = artist.get('albums') or []
+            if not all(isinstance(items, list) for items in (tracks, genres, albums)):
+                return jsonify({'error': f"Invalid tracks, genres or albums for {artist['name']}"}), 400
+            if len(tracks) > Config.ANALYZE_BATCH_MAX_TRACKS:
+                return jsonify({
+                    'error': f'Too many tracks for {artist["name"]} (max {Config.ANALYZE_BATCH_MAX_TRACKS})'
+                }), 400
+            if not all(isinstance(t, dict) for t in tracks) or not all(isinstance(a, dict) for a in albums):
+                return jsonify({'error': f"Invalid tracks or albums for {artist['name']}"}), 400
+            if not all(valid_track_metadata(t) for t in tracks):
+                return jsonify({'error': f"Invalid track data for {artist['name']}"}), 400
+            batch.append((tracks, [str(g) for g in genres], albums, str(artist['name'])))
+            artist_ids.append(str(artist['id']) if artist.get('id') else None)
+        
+        analyses = music_ai.analyze_many(batch)
+        results = []
+        for (_, genres, _, name), artist_id, music_analysis in zip(batch, artist_ids, analyses):
+            results.append({
+                'name': name,
+                'music_analysis': music_analysis,
+                'discovery_insights': music_ai.generate_discovery_insights(
+                    name, genres, music_analysis, artist_id=artist_id
+                )
+            })
         
-    except spotipy.exceptions.SpotifyException as e:
-        logger.error(f"Spotify API error: {e}")
-        return jsonify({'error': 'Music service error. Please try again.'}), 502
+        return jsonify({
+            'success': True,
+            'results': results,
+            'count': len(results)
+        })
         
     except Exception as e:
-        import traceback
-        logger.error(f"Unexpected error in search: {e}\n" + traceback.format_exc())
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error(f"Batch analysis error: {e}")
+        return jsonify({'error': 'Batch analysis failed'}), 500
 
 @app.route('/api/analytics')
 @rate_limit(max_requests=10, window=3600)
@@ -1202,12 +2595,22 @@ def get_analytics():
         )[:10])
         
         total_searches = sum(search_analytics.values())
+        insights_cache_stats = music_insights_cache.stats()
         
         analytics_data = {
             'total_searches': total_searches,
             'top_searches': top_searches,
             'unique_queries': len(search_analytics),
-            'cache_size': len(music_insights_cache),
+            'cache_size': insights_cache_stats['entries'],
+            'cache_stats': insights_cache_stats,
+            'query_alias_stats': query_alias_index.stats(),
+            'analysis_cache_stats': analysis_cache.stats(),
+            'spotify_cache_stats': sp.cache_stats() if isinstance(sp, CachedSpotify) else {},
+            'negative_cache_stats': dict(
+                negative_query_cache.stats(),
+                bloom=negative_query_filter.stats() if negative_query_filter is not None else None
+            ),
+            'coalesced_requests': coalesced_requests.get('search_albums', 0),
             'timestamp': datetime.now().isoformat()
         }
         
@@ -1234,10 +2637,7 @@ def heart_artist():
             return jsonify({'error': 'Artist ID and name required'}), 400
         
         # Check if already liked
-        existing = next((a for a in user_preferences['liked_artists_data'] 
-                        if a['artist_id'] == artist_id), None)
-        
-        if existing:
+        if artist_id in user_preferences['liked_artists_data']:
             return jsonify({
                 'success': False,
                 'error': 'Artist already liked',
@@ -1253,7 +2653,7 @@ def heart_artist():
             'liked_at': datetime.now().isoformat()
         }
         
-        user_preferences['liked_artists_data'].append(artist_data)
+        user_preferences['liked_artists_data'].add(artist_data)
         user_preferences['liked_artists'].add(artist_id)  # Keep for backward compatibility
         
         # Update genre preferences
@@ -1301,19 +2701,14 @@ def save_album():
         if not album_data['album_id'] or not album_data['album_name']:
             return jsonify({'error': 'Album ID and name required'}), 400
         
-        # Check if already saved
-        existing = next((a for a in user_preferences['saved_albums'] 
-                        if a['album_id'] == album_data['album_id']), None)
-        
-        if existing:
+        # Add unless already saved
+        if not user_preferences['saved_albums'].add(album_data):
             return jsonify({
                 'success': False,
                 'error': 'Album already saved',
                 'message': 'This album is already in your collection'
             }), 409  # Conflict status code
         
-        user_preferences['saved_albums'].append(album_data)
-        
         return jsonify({
             'success': True,
             'message': f'Album "{album_data["album_name"]}" saved to your collection',
@@ -1337,13 +2732,7 @@ def unsave_album():
             return jsonify({'error': 'Album ID required'}), 400
         
         # Find and remove the album
-        original_count = len(user_preferences['saved_albums'])
-        user_preferences['saved_albums'] = [
-            album for album in user_preferences['saved_albums'] 
-            if album['album_id'] != album_id
-        ]
-        
-        if len(user_preferences['saved_albums']) == original_count:
+        if user_preferences['saved_albums'].remove(album_id) is None:
             return jsonify({
                 'success': False,
                 'error': 'Album not found in saved collection'
@@ -1374,17 +2763,12 @@ def unlike_artist():
             return jsonify({'error': 'Artist ID required'}), 400
         
         # Remove from liked artists data
-        original_count = len(user_preferences['liked_artists_data'])
-        user_preferences['liked_artists_data'] = [
-            artist for artist in user_preferences['liked_artists_data'] 
-            if artist['artist_id'] != artist_id
-        ]
+        removed = user_preferences['liked_artists_data'].remove(artist_id)
         
         # Remove from liked artists set
-        if artist_id in user_preferences['liked_artists']:
-            user_preferences['liked_artists'].remove(artist_id)
+        user_preferences['liked_artists'].discard(artist_id)
         
-        if len(user_preferences['liked_artists_data']) == original_count:
+        if removed is None:
             return jsonify({
                 'success': False,
                 'error': 'Artist not found in liked collection'
@@ -1453,37 +2837,19 @@ def get_user_preferences():
 def get_my_collection():
     """Get user's liked artists and saved albums"""
     try:
-        # Convert liked_artists set to list with artist names
-        liked_artists_data = []
-        for artist_id in user_preferences['liked_artists']:
-            # For now, we'll need to fetch artist details from Spotify
-            # In a real app, we'd store this info when the user likes an artist
-            try:
-                if sp:
-                    artist_info = sp.artist(artist_id)
-                    liked_artists_data.append({
-                        'artist_id': artist_id,
-                        'artist_name': artist_info['name'],
-                        'image': artist_info['images'][0]['url'] if artist_info['images'] else None,
-                        'popularity': artist_info['popularity'],
-                        'genres': artist_info['genres']
-                    })
-            except Exception as e:
-                logger.warning(f"Could not fetch artist {artist_id}: {e}")
-                # Fallback for artist we can't fetch
-                liked_artists_data.append({
-                    'artist_id': artist_id,
-                    'artist_name': 'Unknown Artist',
-                    'image': None,
-                    'popularity': 0,
-                    'genres': []
-                })
+        liked_artists = user_preferences['liked_artists_data'].to_list()
+        
+        # Refreshing artist details from Spotify is opt-in and batched
+        if request.args.get('enrich') == '1' and sp:
+            details = fetch_artist_details([a['artist_id'] for a in liked_artists])
+            liked_artists = [dict(a, **details[a['artist_id']]) if a['artist_id'] in details else a
+                             for a in liked_artists]
         
         return jsonify({
             'success': True,
             'data': {
-                'liked_artists': user_preferences['liked_artists_data'],
-                'saved_albums': user_preferences['saved_albums'],
+                'liked_artists': liked_artists,
+                'saved_albums': user_preferences['saved_albums'].to_list(),
                 'liked_count': len(user_preferences['liked_artists_data']),
                 'saved_albums_count': len(user_preferences['saved_albums'])
             }
@@ -1502,6 +2868,7 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'spotify_api': sp_status,
+            'audio_features_circuit': audio_features_breaker.snapshot(),
             'timestamp': datetime.now().isoformat(),
             'version': '2.0.0'
         })
@@ -0,0 +1,50 @@
+"""Benchmark feature statistics: NumPy matrix path vs pure-Python fallback.
+
+Usage: python benchmarks/bench_feature_statistics.py
+
+Times compute_feature_statistics' two implementations on 20 (one artist's
+top tracks), 1k and 100k tracks. The NumPy path is skipped if NumPy is not
+installed.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import AUDIO_FEATURE_KEYS, _feature_statistics_numpy, _feature_statistics_python, np
+
+
+def make_tracks(count, rng):
+    tracks = []
+    for _ in range(count):
+        track = {key: rng.random() for key in AUDIO_FEATURE_KEYS}
+        track['tempo'] = rng.uniform(60, 200)
+        tracks.append(track)
+    return tracks
+
+
+def best_of(fn, tracks, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(tracks, AUDIO_FEATURE_KEYS)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    rng = random.Random(42)
+    for count, repeats in ((20, 200), (1_000, 20), (100_000, 3)):
+        tracks = make_tracks(count, rng)
+        python_ms = best_of(_feature_statistics_python, tracks, repeats)
+        line = f"{count:>7} tracks: python {python_ms:9.3f} ms"
+        if np is not None:
+            numpy_ms = best_of(_feature_statistics_numpy, tracks, repeats)
+            line += f", numpy {numpy_ms:9.3f} ms ({python_ms / numpy_ms:4.1f}x)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
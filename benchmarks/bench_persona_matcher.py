@@ -0,0 +1,62 @@
+"""Benchmark artist persona/title lookup as the profile table grows.
+
+Usage: python benchmarks/bench_persona_matcher.py
+
+Compares ArtistMatcher.match() with the linear substring scan it replaced
+for tables of 40 (the shipped table) up to 10k entries.
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import ArtistMatcher, music_content
+
+ARTIST_PROFILES = music_content.get()['artist_profiles']
+
+LOOKUPS = 20_000
+
+
+def synthetic_profiles(count, rng):
+    profiles = list(ARTIST_PROFILES)
+    while len(profiles) < count:
+        name = ' '.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(2))
+        profiles.append({'patterns': [name], 'title': name.title()})
+    return profiles
+
+
+def linear_scan(profiles, text):
+    for entry in profiles:
+        if 'title' in entry and any(pattern in text for pattern in entry.get('patterns', ())):
+            return entry['title']
+    return None
+
+
+def time_per_lookup(fn, names):
+    start = time.perf_counter()
+    for name in names:
+        fn(name)
+    return (time.perf_counter() - start) / len(names) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    for size in (len(ARTIST_PROFILES), 100, 1_000, 10_000):
+        profiles = synthetic_profiles(size, rng)
+        matcher = ArtistMatcher([(entry, entry['title']) for entry in profiles if 'title' in entry])
+        # Half the lookups hit a known artist, half are unknown names
+        known = [rng.choice(profiles)['patterns'][0] for _ in range(LOOKUPS // 2)]
+        unknown = [f"unknown artist {i}" for i in range(LOOKUPS // 2)]
+        names = known + unknown
+        rng.shuffle(names)
+
+        matcher_us = time_per_lookup(matcher.match, names)
+        linear_us = time_per_lookup(lambda name: linear_scan(profiles, name), names[:2_000])
+        print(f"{size:>6} entries: matcher {matcher_us:6.2f} us/lookup, linear scan {linear_us:9.2f} us/lookup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""Rate limiters, caches and request-coordination helpers shared across workers.
+
+Redis-backed classes run against fakeredis, so no server is needed.
+"""
+import threading
+import time
+
+import pytest
+
+import app
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(app.time, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.mark.parametrize('make_limiter', [
+    lambda client: app.TokenBucketLimiter(),
+    lambda client: app.RedisRateLimiter(client=client)
+], ids=['memory', 'redis'])
+def test_limiter_allows_burst_then_refills(make_limiter, redis_client):
+    limiter = make_limiter(redis_client)
+    
+    assert [limiter.hit('1.2.3.4', 3, 60, now=100.0)[0] for _ in range(3)] == [True] * 3
+    allowed, retry_after = limiter.hit('1.2.3.4', 3, 60, now=100.0)
+    assert not allowed
+    assert retry_after == pytest.approx(20.0)
+    
+    # Other clients have their own bucket
+    assert limiter.hit('5.6.7.8', 3, 60, now=100.0)[0]
+    # One token refills every window / max_requests seconds
+    assert limiter.hit('1.2.3.4', 3, 60, now=120.0) == (True, 0.0)
+    assert not limiter.hit('1.2.3.4', 3, 60, now=120.0)[0]
+
+
+def test_limiter_clear_and_len(redis_client):
+    for limiter in (app.TokenBucketLimiter(), app.RedisRateLimiter(client=redis_client)):
+        limiter.hit('a', 5, 60)
+        limiter.hit('b', 5, 60)
+        assert len(limiter) == 2
+        limiter.clear()
+        assert len(limiter) == 0
+
+
+def test_redis_limiter_keys_expire_when_idle(redis_client):
+    limiter = app.RedisRateLimiter(client=redis_client, prefix='rl:')
+    limiter.hit('client', 10, 30)
+    assert 0 < redis_client.pttl('rl:client') <= 30000
+
+
+def test_redis_cache_round_trip(redis_client):
+    cache = app.RedisCache('artists', client=redis_client, ttl=60)
+    
+    assert cache.get('missing', 'default') == 'default'
+    cache.set('drake', {'id': 'art1', 'genres': ['rap']})
+    assert cache.get('drake') == {'id': 'art1', 'genres': ['rap']}
+    assert 0 < redis_client.pttl('cache:artists:drake') <= 60000
+    
+    cache.set('short', True, ttl=5)
+    assert 0 < redis_client.pttl('cache:artists:short') <= 5000
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['errors']) == (1, 1, 0)
+
+
+def test_redis_cache_namespaces_are_isolated(redis_client):
+    artists = app.RedisCache('artists', client=redis_client)
+    albums = app.RedisCache('albums', client=redis_client)
+    artists.set('key', 1)
+    albums.set('key', 2)
+    
+    artists.clear()
+    
+    assert artists.get('key') is None
+    assert albums.get('key') == 2
+    assert len(albums) == 1
+
+
+def test_redis_cache_treats_store_errors_as_misses():
+    class BrokenClient:
+        def get(self, key):
+            raise ConnectionError('down')
+        
+        def set(self, *args, **kwargs):
+            raise ConnectionError('down')
+    
+    cache = app.RedisCache('artists', client=BrokenClient())
+    cache.set('key', 1)
+    assert cache.get('key', 'fallback') == 'fallback'
+    assert cache.stats()['errors'] == 2
+
+
+def test_single_flight_shares_one_call():
+    flights = app.SingleFlight('test')
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    joined = []
+    
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'value': 42}
+    
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do('key', load)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(flights.do('key', load, on_coalesced=lambda: joined.append(1))))
+        for _ in range(4)
+    ]
+    for thread in followers:
+        thread.start()
+    while len(joined) < len(followers):
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    
+    assert len(calls) == 1
+    assert len(joined) == 4
+    assert results == [{'value': 42}] * 5
+    # Nothing is cached once the call finishes
+    assert flights.do('key', lambda: 'fresh') == 'fresh'
+
+
+def test_single_flight_propagates_errors_to_every_caller():
+    flights = app.SingleFlight('test')
+    started = threading.Event()
+    release = threading.Event()
+    joined = threading.Event()
+    errors = []
+    
+    def load():
+        started.set()
+        release.wait(5)
+        raise ValueError('upstream failed')
+    
+    def call(on_coalesced=None):
+        try:
+            flights.do('key', load, on_coalesced=on_coalesced)
+        except ValueError as e:
+            errors.append(e)
+    
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call, args=(joined.set,))
+    follower.start()
+    joined.wait(5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    
+    assert len(errors) == 2
+    assert all(str(e) == 'upstream failed' for e in errors)
+    assert flights.do('key', lambda: 'recovered') == 'recovered'
+
+
+def test_circuit_breaker_recovers_through_half_open(clock):
+    breaker = app.CircuitBreaker('features', failure_threshold=2, reset_timeout=60)
+    
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == app.CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    
+    clock.now += 60
+    assert breaker.allow_request()
+    assert breaker.state == app.CircuitBreaker.HALF_OPEN
+    # Only one trial request at a time
+    assert not breaker.allow_request()
+    
+    breaker.record_success()
+    assert breaker.state == app.CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+    assert breaker.snapshot()['trips'] == 1
+
+
+def test_circuit_breaker_failed_trial_reopens(clock):
+    breaker = app.CircuitBreaker('features', failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow_request()
+    
+    breaker.record_failure()
+    
+    assert breaker.state == app.CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot()['retry_in_seconds'] == pytest.approx(60)
+
+
+def test_circuit_breaker_abandoned_trial_is_replaced(clock):
+    breaker = app.CircuitBreaker('features', failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow_request()  # trial that never reports back
+    
+    clock.now += 30
+    assert not breaker.allow_request()
+    clock.now += 30
+    assert breaker.allow_request()
+    assert breaker.state == app.CircuitBreaker.HALF_OPEN
+
+
+@pytest.mark.parametrize('album_type, offset, fetched_at', [
+    ('album', 50, 1700000000.25),
+    ('album,single', 0, 1700000000),
+    ('appears_on,compilation', 1000, 0.5)
+])
+def test_album_cursor_round_trip(album_type, offset, fetched_at):
+    cursor = app.encode_album_cursor(album_type, offset, fetched_at)
+    
+    assert '=' not in cursor
+    assert app.decode_album_cursor(cursor) == (album_type, offset, fetched_at)
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    'é',
+    app.encode_album_cursor('album', -50, 1.0),
+    app.encode_album_cursor('albums', 50, 1.0),
+    app.encode_album_cursor('album', 1.5, 1.0),
+    app.encode_album_cursor('album', 50, True),
+    app.encode_album_cursor('album', 50, 'yesterday')
+])
+def test_album_cursor_rejects_malformed_input(cursor):
+    with pytest.raises(ValueError):
+        app.decode_album_cursor(cursor)